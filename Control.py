@@ -5,12 +5,13 @@ Created on Thu Oct  9 13:16:03 2025
 @author: oscar
 """
 
-import laadpaalData as lpd
-import ElectricCars as ec
-import GeodataEnCars as gc
-
 import streamlit as st
 
+import figuurCache
+import paginas
+import profiel
+import verversing
+
 # --- Pagina instellingen ---
 st.set_page_config(page_title="Auto Dashboard", layout="wide")
 
@@ -18,13 +19,21 @@ st.set_page_config(page_title="Auto Dashboard", layout="wide")
 st.sidebar.title("📂 Navigatie")
 pagina = st.sidebar.radio(
     "Kies een sectie:",
-    ["🚗 Auto Dashboard", "⚡Laadpalen Data"]
+    list(paginas.PAGINAS),
+    key="pagina",
 )
 
-if pagina == "⚡Laadpalen Data":
-    lpd.laadpaal()
-    
-elif pagina == "🚗 Auto Dashboard":
-    gc.car_data()
+# Debugpaneel: metingen van deze render #
+profiel_aan = st.sidebar.checkbox("⏱️ Profiel tonen", value=profiel.STANDAARD)
+profiel.begin_render(profiel_aan, pagina)
+
+# Alleen de modules van de gekozen pagina worden geïmporteerd #
+with profiel.stap(f"pagina {pagina}"):
+    paginas.toon(pagina)
 
-    ec.carsy()
+if profiel_aan:
+    st.sidebar.dataframe(profiel.tabel(), hide_index=True)
+    st.sidebar.caption("Figuurcache")
+    st.sidebar.json(figuurCache.statistiek())
+    st.sidebar.caption("Verversing")
+    st.sidebar.json(verversing.status())
@@ -1,95 +1,54 @@
-import pandas as pd
-import numpy as np 
-import requests
-import plotly.express as px
-import folium
-#from ipywidgets import interact, Dropdown
-from folium.plugins import MarkerCluster
+import numpy as np
 import streamlit as st
-import re
 from streamlit_folium import st_folium
-#import numpy as np
-import plotly.graph_objects as go
 
-# --- Data inladen ---
-@st.cache_data
-def load_data():
-    cars = pd.read_pickle('cars.pkl')
-    cars['datum_eerste_toelating'] = pd.to_datetime(cars['datum_eerste_toelating'], errors='coerce')
-    cars['jaar_maand'] = cars['datum_eerste_toelating'].dt.to_period('M').astype(str)
-    return cars
+import autoGrafieken as ag
+import figuurCache as fc
+import laadpaalDichtheid as ld
+import laadpaalKaarten as kk
+import profiel
+import ruimtelijkeIndex as ri
+import verversing
+import voertuigData as vd
 
-cars = load_data()
+DICHTHEID_TIMEOUT = 10  # seconden
 
 def car_data():
     st.title("🚗 Auto Dashboard")
 
-    # --- Totale aantallen per merk ---
-    totaal_per_merk = cars.groupby('merk').size().sort_values(ascending=False)
+    # --- Data inladen (gedeeld, al getypeerd en genormaliseerd) ---
+    with profiel.stap("car_data: momentopname") as meting:
+        momentopname = verversing.huidig("voertuigen")
+        kubus, piramide = momentopname["data"]["kubus"], momentopname["data"]["piramide"]
+        meting["rijen"] = len(momentopname["data"]["cars"])
+    versie = momentopname["versie"]
+
+    # --- Totale aantallen per merk (uit de tellingen-kubus) ---
+    totaal_per_merk = vd.merk_totalen(kubus)
     top5 = totaal_per_merk.nlargest(5).index
     top10 = totaal_per_merk.nlargest(10).index
 
-    autos_per_merk_per_maand = (
-        cars.groupby(['jaar_maand', 'merk'])
-            .size()
-            .reset_index(name='aantal_autos')
-    )
-
-    # --- Normalisatie-functie voor model ---
-    def normalize_model(name):
-        if pd.isna(name):
-            return None
-        name = name.upper().strip()
-        match = re.match(r'(MODEL [A-Z0-9]+)', name)
-        if match:
-            return match.group(1)
-        match = re.match(r'(ID\.?\s*\d)', name)
-        if match:
-            return match.group(1).replace(' ', '').upper()
-        match = re.match(r'(E[-\s]?\d+)', name)
-        if match:
-            return match.group(1).replace(' ', '').upper()
-        return name.split()[0]
-
-    cars['model_basis'] = cars['handelsbenaming'].apply(normalize_model)
+    autos_per_merk_per_maand = vd.per_merk_per_maand(kubus, top10)
 
     # --- Functies voor grafieken ---
     def plot_top_merks(top_labels, titel):
-        filtered = autos_per_merk_per_maand[autos_per_merk_per_maand['merk'].isin(top_labels)]
-        fig = px.scatter(
-            filtered,
-            x='jaar_maand',
-            y='aantal_autos',
-            color='merk',
-            title=titel,
-        )
-        fig.update_traces(mode='lines+markers', marker=dict(size=6, opacity=0.7), line=dict(width=0.5))
-        fig.update_layout(template='plotly_white', xaxis=dict(categoryorder='category ascending'), 
-                          xaxis_title='Maand', yaxis_title='Aantal auto\'s')
+        fig = fc.haal(("top_merken", versie, tuple(top_labels)),
+                      lambda: ag.top_merken_figuur(autos_per_merk_per_maand, top_labels, titel))
         st.plotly_chart(fig, use_container_width=True)
 
     def plot_merk_trends(merknaam):
-        merk_df = cars[cars['merk'].str.upper() == merknaam.upper()]
-        if merk_df.empty:
+        # Slice uit de kubus in plaats van een stringvergelijking over alle auto's
+        def maak():
+            per_model_per_maand = vd.per_model_per_maand(kubus, merknaam)
+            if per_model_per_maand.empty:
+                return None
+            return ag.merk_trends_figuur(per_model_per_maand, merknaam)
+
+        fig = fc.haal(("merk_trends", versie, merknaam), maak)
+        if fig is None:
             st.warning(f"⚠️ Geen resultaten gevonden voor merk: {merknaam}")
             return
 
-        per_model_per_maand = (
-            merk_df.groupby(['jaar_maand', 'model_basis'])
-                .size()
-                .reset_index(name='aantal_autos')
-        )
-
-        fig = px.scatter(
-            per_model_per_maand,
-            x='jaar_maand',
-            y='aantal_autos',
-            color='model_basis',
-            title=f"Aantal auto's per model van {merknaam} door de maanden heen",
-        )
-        fig.update_traces(mode='lines+markers', marker=dict(size=6, opacity=0.7), line=dict(width=0.5))
-        fig.update_layout(template='plotly_white', xaxis=dict(categoryorder='category ascending'),
-                          xaxis_title='Maand', yaxis_title='Aantal auto\'s')
         st.plotly_chart(fig, use_container_width=True)
 
     # --- Keuze tussen Top 5 / 10 ---
@@ -108,7 +67,7 @@ def car_data():
     st.markdown("---")
     st.markdown("### 🔍 Modeltrends per merk")
 
-    merk_opties = sorted(cars['merk'].dropna().unique())
+    merk_opties = sorted(totaal_per_merk.index)
     merk_naam = st.selectbox("Selecteer een merk om modeltrends te bekijken:", merk_opties, index=0)
     plot_merk_trends(merk_naam)
 
@@ -119,161 +78,115 @@ def car_data():
     # ✅ Checkbox voor log-schaal
     log_scale = st.checkbox("Logaritmische schaal gebruiken", value=True)
 
-    fig_inrichting = px.histogram(
-        cars,
-        x='inrichting',
-        color='inrichting',
-        title="Aantal auto’s per inrichting",
-        log_y=log_scale
-    )
-    freq = cars["inrichting"].value_counts().sort_values(ascending=False)
-    fig_inrichting.update_xaxes(
-        categoryorder="array", 
-        categoryarray=freq.index
-    )    
-    fig_inrichting.update_layout(
-        xaxis_title='Carrosserie',
-        yaxis_title="Aantal auto's (log)" if log_scale else "Aantal auto's",
-        template='plotly_white'
-    )
+    fig_inrichting = fc.haal(("inrichting", versie, log_scale),
+                             lambda: ag.inrichting_figuur(vd.per_inrichting(kubus), log_scale))
     st.plotly_chart(fig_inrichting, use_container_width=True)
 
-    # Breedte en lengte naar numeriek
-    cars['breedte'] = pd.to_numeric(cars['breedte'], errors='coerce')
-    cars['lengte'] = pd.to_numeric(cars['lengte'], errors='coerce')
+    # --- Lengte x breedte uit de piramide ---
+    # Het gekozen bereik bepaalt het niveau: zo fijn als past binnen MAX_POINTS cellen
+    st.markdown("---")
+    st.markdown("### 📏 Lengte en breedte")
+    (x_min, x_max), (y_min, y_max) = vd.piramide_bereik(piramide)
+    col1, col2 = st.columns(2)
+    x_bereik = col1.slider("Breedte (cm)", x_min, x_max, (x_min, x_max))
+    y_bereik = col2.slider("Lengte (cm)", y_min, y_max, (y_min, y_max))
 
-    # Filter geldige rijen
-    cars_filtered = cars[(cars['breedte'] > 0) & (cars['lengte'] > 0)]
+    with profiel.stap("car_data: lengte x breedte"):
+        def maak_lengte_breedte():
+            cellen, bakken = vd.piramide_cellen(piramide, x_bereik, y_bereik, ag.MAX_POINTS)
+            return ag.lengte_breedte_figuur(cellen, piramide["sommen"], (x_bereik, y_bereik), bakken)
 
-    # Groepeer op breedte en lengte en tel aantal identieke auto's
-    cars_grouped = (
-        cars_filtered.groupby(['breedte', 'lengte'])
-                    .size()
-                    .reset_index(name='aantal')
-    )
-
-    # Downsample indien te veel punten
-    MAX_POINTS = 5000  # stel limiet in voor plot
-    if len(cars_grouped) > MAX_POINTS:
-        cars_grouped = cars_grouped.sample(n=MAX_POINTS, weights='aantal', random_state=42)
-
-    # Trendline berekenen op de unieke of gesamplede punten
-    x = cars_grouped['breedte'].values
-    y = cars_grouped['lengte'].values
-    trendline = np.polyval(np.polyfit(x, y, 1), x)
-
-    # Marker grootte proportioneel aan aantal identieke auto's
-    sizes = np.clip(cars_grouped['aantal'], 1, 4000)  # max marker size 50
-
-    # Plot met ScatterGL voor snelheid
-    fig = go.Figure()
-    fig.add_trace(go.Scattergl(
-        x=x,
-        y=y,
-        mode='markers',
-        marker=dict(
-            size=sizes,
-            color=sizes,
-            colorscale='Viridis',
-            showscale=True,
-            sizemode='area',
-            sizeref=2.*max(sizes)/(50.**2),  # max marker niet te groot
-        ),
-        text=cars_grouped['aantal'],
-        name="Auto's"
-    ))
-
-    # Trendline toevoegen
-    fig.add_trace(go.Scatter(
-        x=x,
-        y=trendline,
-        mode='lines',
-        line=dict(color='red'),
-        name='Trendline'
-    ))
-
-    fig.update_layout(
-        title="Lengte vs Breedte van auto's (samengevoegd en downsampled)",
-        xaxis_title='Breedte',
-        yaxis_title='Lengte',
-        template='plotly_white',
-        showlegend=False
-    )
+        fig = fc.haal(("lengte_breedte", versie, x_bereik, y_bereik), maak_lengte_breedte)
 
     st.plotly_chart(fig, use_container_width=True)
     
-def lp_map():
-    data_openchargemap = requests.get("https://api.openchargemap.io/v3/poi/?output=json&countrycode=NL&maxresults=1000&compact=true&verbose=false&key=5d087822-ce71-42b0-a231-67209f0900a2")
+@st.cache_resource(max_entries=len(ri.PROVINCIE_LOCATIES))
+def maak_kaart(versie, provincie, _Laadpaal_locatie):
+    return kk.laadpalen_kaart(provincie, _Laadpaal_locatie)
 
-    Laadpalen = pd.json_normalize(data_openchargemap.json())
+@st.cache_resource(max_entries=2 * len(ld.NIVEAUS))
+def maak_dichtheid_kaart(versie, niveau, grootheid, _regios):
+    return kk.dichtheid_kaart(grootheid, _regios)
 
-    df = pd.json_normalize(Laadpalen.Connections)
-    df2 = pd.json_normalize(df[0])
-    Laadpalen = pd.concat([Laadpalen, df2], axis=1)
+def lp_map():
+    # Laadpalen, provincies en de ruimtelijke index worden op de achtergrond
+    # opgehaald en opgebouwd (OpenChargeMap met TTL-cache en offline snapshot)
+    with profiel.stap("lp_map: momentopname") as meting:
+        data = verversing.huidig("laadpalen")["data"]
+        Laadpaal_locatie, index = data["locaties"], data["index"]
+        meting["rijen"] = len(Laadpaal_locatie)
+    versie = data["hash"]
 
     st.markdown("Bekijk de locaties van laadpalen in Nederland, gefilterd per provincie.")
 
-
-    # 📍 Coördinaten van provincies
-    provincie_locaties = {
-        "Alle provincies": {"center": [52.2129919, 5.2793703], "zoom": 7},   # Midden Nederland
-        "Groningen": {"center": [53.2194, 6.5665], "zoom": 10},
-        "Friesland": {"center": [53.1642, 5.7818], "zoom": 10},
-        "Drenthe": {"center": [52.9480, 6.6231], "zoom": 10},
-        "Overijssel": {"center": [52.4380, 6.5010], "zoom": 10},
-        "Flevoland": {"center": [52.5279, 5.5953], "zoom": 10},
-        "Gelderland": {"center": [52.0452, 5.8718], "zoom": 10},
-        "Utrecht": {"center": [52.0907, 5.1214], "zoom": 11},
-        "Noord-Holland": {"center": [52.5200, 4.7885], "zoom": 9},
-        "Zuid-Holland": {"center": [51.9961, 4.5597], "zoom": 10},
-        "Zeeland": {"center": [51.4940, 3.8490], "zoom": 10},
-        "Noord-Brabant": {"center": [51.4827, 5.2322], "zoom":10},
-        "Limburg": {"center": [51.4427, 6.0600], "zoom": 9}
-    }
-
-    # Filter de Laadpalen DataFrame op geldige coördinaten
-    Laadpaal_locatie = Laadpalen[[
-        "AddressInfo.AddressLine1",
-        "AddressInfo.Latitude",
-        "AddressInfo.Longitude",
-        "PowerKW"
-    ]].dropna(subset=["AddressInfo.Latitude", "AddressInfo.Longitude"])
-
     # Dropdown voor provincies
     provincie = st.selectbox(
         "📍 Kies een provincie:",
-        options=list(provincie_locaties.keys()),
+        options=list(ri.PROVINCIE_LOCATIES.keys()),
         index=0
     )
 
-    # Kaart functie
-    def maak_kaart(provincie):
-        loc = provincie_locaties.get(provincie, provincie_locaties["Alle provincies"])
-        m = folium.Map(location=loc["center"], zoom_start=loc["zoom"], tiles="CartoDB positron")
-
-        cluster = MarkerCluster().add_to(m)
-
-        # Voeg alle laadpalen toe
-        for _, r in Laadpaal_locatie.iterrows():
-            folium.CircleMarker(
-                location=[r["AddressInfo.Latitude"], r["AddressInfo.Longitude"]],
-                radius=3,
-                color="blue",
-                fill=True,
-                fill_opacity=0.7,
-                popup=f"{r['AddressInfo.AddressLine1']}<br>Vermogen: {r['PowerKW']} kW"
-            ).add_to(cluster)
-
-        return m
+    # Kaart per provincie één keer opbouwen, alleen met de laadpalen in die provincie
+    with profiel.stap("lp_map: kaart"):
+        m = maak_kaart(versie, provincie, Laadpaal_locatie)
 
     # Toon kaart in Streamlit
-    m = maak_kaart(provincie)
-    st_folium(m, width=1200, height=700)
-
-
-
-
-
-
-
-
+    loc = ri.PROVINCIE_LOCATIES.get(provincie, ri.PROVINCIE_LOCATIES["Alle provincies"])
+    with profiel.stap("lp_map: st_folium"):
+        st_folium(m, center=loc["center"], zoom=loc["zoom"], key="laadpalen_kaart",
+                  width=1200, height=700, returned_objects=[])
+
+    # --- Laadpalen rond een punt ---
+    st.markdown("#### 🔎 Laadpalen in de buurt")
+    col1, col2, col3, col4 = st.columns(4)
+    lat = col1.number_input("Breedtegraad", value=float(loc["center"][0]), format="%.4f")
+    lon = col2.number_input("Lengtegraad", value=float(loc["center"][1]), format="%.4f")
+    straal = col3.slider("Straal (km)", 1, 50, 5)
+    aantal = col4.number_input("Dichtstbijzijnde N", min_value=1, max_value=100, value=10)
+
+    with profiel.stap("lp_map: buurt-query"):
+        binnen, _ = ri.binnen_straal(index, lat, lon, straal)
+        posities, afstanden = ri.dichtstbij(index, lat, lon, int(aantal))
+    st.markdown(f"**{len(binnen)}** laadpalen binnen {straal} km.")
+
+    dichtstbij = Laadpaal_locatie.iloc[posities][["AddressInfo.AddressLine1", "Provincie", "PowerKW"]].assign(
+        Afstand_km=np.round(afstanden, 2))
+    st.dataframe(dichtstbij, hide_index=True)
+
+    # --- Laadpalen per elektrische auto, uit de opzoektabel van de verversing ---
+    st.markdown("#### ⚡ Laadpalen per elektrische auto")
+    dichtheid_sectie()
+
+def dichtheid_sectie():
+    # Hangt van cars.pkl af; de rest van de laadpaalpagina mag daar niet op wachten
+    with profiel.stap("lp_map: dichtheid"):
+        try:
+            dichtheid = verversing.huidig("dichtheid", timeout=DICHTHEID_TIMEOUT)
+        except TimeoutError:
+            st.info("De laadpalen per auto worden nog opgebouwd; ververs de pagina straks opnieuw.")
+            return
+        except Exception as fout:
+            st.warning(f"Laadpalen per auto niet beschikbaar: {fout}")
+            return
+    niveau = st.radio("Regio:", ld.NIVEAUS, index=1, horizontal=True, key="dichtheid_niveau")
+    regios = dichtheid["data"]["regios"]
+    regios = regios[regios["niveau"] == niveau]
+
+    # Zonder regio van de houder in cars.pkl zijn er per regio alleen laadpalen
+    grootheid = "per_1000_ev" if regios["per_1000_ev"].notna().any() else "laadpalen"
+    if grootheid == "laadpalen":
+        st.caption("cars.pkl heeft geen regio van de houder; per regio wordt het aantal laadpalen getoond.")
+
+    with profiel.stap("lp_map: dichtheid kaart"):
+        m_dichtheid = maak_dichtheid_kaart(dichtheid["versie"], niveau, grootheid, regios)
+    st_folium(m_dichtheid, center=ri.PROVINCIE_LOCATIES["Alle provincies"]["center"],
+              zoom=ri.PROVINCIE_LOCATIES["Alle provincies"]["zoom"], key="dichtheid_kaart",
+              width=1200, height=500, returned_objects=[])
+
+    opties = regios.sort_values(grootheid, ascending=False)["regio"].tolist()
+    gekozen = st.multiselect("Regio's in de trend:", opties, default=opties[:5], key="dichtheid_regios")
+    tijdlijn = dichtheid["data"]["tijdlijn"]
+    fig_trend = fc.haal(("dichtheid_trend", dichtheid["versie"], niveau, grootheid, tuple(gekozen)),
+                        lambda: ag.dichtheid_trend_figuur(
+                            tijdlijn[(tijdlijn["niveau"] == niveau) & tijdlijn["regio"].isin(gekozen)], grootheid))
+    st.plotly_chart(fig_trend, use_container_width=True)
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import trendlijn as tl
+
+# --- Grafieken van de autopagina ---
+# Pure functies van (geaggregeerde) data naar een figuur, zonder st.*, zodat
+# dezelfde figuren ook buiten Streamlit gemaakt kunnen worden (rapport.py).
+
+MAX_POINTS = 5000  # stel limiet in voor plot (cellen van de piramide)
+
+
+def _maand_lijnen(fig):
+    fig.update_traces(mode='lines+markers', marker=dict(size=6, opacity=0.7), line=dict(width=0.5))
+    fig.update_layout(template='plotly_white', xaxis=dict(categoryorder='category ascending'),
+                      xaxis_title='Maand', yaxis_title='Aantal auto\'s')
+    return fig
+
+
+def top_merken_figuur(autos_per_merk_per_maand, top_labels, titel):
+    filtered = autos_per_merk_per_maand[autos_per_merk_per_maand['merk'].isin(top_labels)]
+    fig = px.scatter(
+        filtered,
+        x='jaar_maand',
+        y='aantal_autos',
+        color='merk',
+        title=titel,
+    )
+    return _maand_lijnen(fig)
+
+
+def merk_trends_figuur(per_model_per_maand, merknaam):
+    fig = px.scatter(
+        per_model_per_maand,
+        x='jaar_maand',
+        y='aantal_autos',
+        color='model_basis',
+        title=f"Aantal auto's per model van {merknaam} door de maanden heen",
+    )
+    return _maand_lijnen(fig)
+
+
+def inrichting_figuur(freq, log_scale):
+    fig_inrichting = px.bar(
+        freq.reset_index(name='count'),
+        x='inrichting',
+        y='count',
+        color='inrichting',
+        title="Aantal auto’s per inrichting",
+        log_y=log_scale
+    )
+    fig_inrichting.update_xaxes(
+        categoryorder="array", 
+        categoryarray=freq.index
+    )    
+    fig_inrichting.update_layout(
+        xaxis_title='Carrosserie',
+        yaxis_title="Aantal auto's (log)" if log_scale else "Aantal auto's",
+        template='plotly_white'
+    )
+    return fig_inrichting
+
+
+def lengte_breedte_figuur(cellen, sommen, bereik=None, bakken=None):
+    """Lengte tegen breedte uit de cellen van de piramide (vd.piramide_cellen).
+
+    Elke cel staat op het zwaartepunt van zijn auto's; de trendlijn is de
+    exacte OLS-fit over alle auto's uit de sommen.
+    """
+    x = cellen['breedte'].to_numpy()
+    y = cellen['lengte'].to_numpy()
+
+    # Marker grootte proportioneel aan aantal auto's in de cel
+    sizes = np.clip(cellen['aantal'].to_numpy(), 1, 4000)  # max marker size 50
+
+    # Plot met ScatterGL voor snelheid
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=x,
+        y=y,
+        mode='markers',
+        marker=dict(
+            size=sizes,
+            color=sizes,
+            colorscale='Viridis',
+            showscale=True,
+            sizemode='area',
+            sizeref=2.*max(sizes.max(initial=1), 1)/(50.**2),  # max marker niet te groot
+        ),
+        text=cellen['aantal'],
+        name="Auto's"
+    ))
+
+    # Trendline over het getoonde bereik
+    trend = tl.fit(sommen)
+    if trend is not None and len(x):
+        x_lijn = np.array(bereik[0] if bereik is not None else [x.min(), x.max()], dtype='float64')
+        fig.add_trace(go.Scatter(
+            x=x_lijn,
+            y=trend[0] * x_lijn + trend[1],
+            mode='lines',
+            line=dict(color='red'),
+            name='Trendline'
+        ))
+
+    raster = f", raster {bakken}×{bakken}" if bakken else ""
+    fig.update_layout(
+        title=f"Lengte vs Breedte van {int(sommen[tl.N]):,} auto's (samengevoegd per cel{raster})",
+        xaxis_title='Breedte',
+        yaxis_title='Lengte',
+        template='plotly_white',
+        showlegend=False
+    )
+    if bereik is not None:
+        fig.update_xaxes(range=list(bereik[0]))
+        fig.update_yaxes(range=list(bereik[1]))
+    return fig
+
+
+DICHTHEID_LABELS = {"per_1000_ev": "Laadpalen per 1000 auto's", "laadpalen": "Aantal laadpalen",
+                    "evs": "Aantal elektrische auto's"}
+
+
+def dichtheid_trend_figuur(tijdlijn, grootheid):
+    """Cumulatief verloop per regio uit de opzoektabel van laadpaalDichtheid."""
+    fig = px.line(
+        tijdlijn,
+        x='maand',
+        y=grootheid,
+        color='regio',
+        title=f"{DICHTHEID_LABELS[grootheid]} door de maanden heen",
+    )
+    fig.update_layout(template='plotly_white', xaxis_title='Maand', yaxis_title=DICHTHEID_LABELS[grootheid])
+    return fig
+
+
+def prijs_figuur(artefacten):
+    """Voorspelde tegen werkelijke catalogusprijs op de testset van het prijsmodel."""
+    y_test = pd.Series(artefacten["y_test"])
+
+    # plot
+    plot_df = pd.DataFrame({
+        "Actual Price": y_test,
+        "Predicted Price": artefacten["y_pred"]
+    })
+    
+    plot_df["Error Value"] = np.abs(plot_df["Predicted Price"] - plot_df["Actual Price"])
+    
+    fig = px.scatter(
+        plot_df,
+        x="Actual Price",
+        y="Predicted Price",    
+        color="Error Value", 
+        color_continuous_scale="RdYlGn_r", 
+        opacity=0.6,
+        title="Predicted vs. Actual Car Prices"
+    )
+    
+    fig.add_scatter(
+        x=[y_test.min(), y_test.max()],
+        y=[y_test.min(), y_test.max()],
+        mode="lines",
+        name="Regression Line",
+        line=dict(dash="dot")
+    )
+    
+    fig.update_layout(
+        xaxis_title="Actual Price (in €)",
+        yaxis_title="Predicted Price (in €)",
+        legend_title=None
+    )
+
+    fig.update_yaxes(range=[0,150000])
+    return fig
@@ -0,0 +1,260 @@
+import datetime
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# --- Benchmarks van de datapaden achter elke pagina ---
+# Zonder browser of Streamlit-server: per stap wandkloktijd, piekgeheugen
+# (tracemalloc, dus alleen wat via Python/NumPy gealloceerd wordt) en de
+# grootte van wat er naar de browser zou gaan (JSON van de figuur) of van
+# het tussenresultaat. Elke run wordt met de commit toegevoegd aan
+# benchmarks/historie.json.
+#
+#   python benchmarks/dataprep.py [--schaal 10k,1m] [--stap laadpaal] [--zonder-geheugen] [--geen-historie]
+
+HIER = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HIER)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HIER)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import autoGrafieken as ag  # noqa: E402
+import laadpaalAnalyse as la  # noqa: E402
+import laadpaalBezetting as lb  # noqa: E402
+import laadpaalDichtheid as ld  # noqa: E402
+import laadpaalGrafieken as lg  # noqa: E402
+import laadpaalInlezen as li  # noqa: E402
+import laadpaalKaarten as kk  # noqa: E402
+import laadpaalStream as ls  # noqa: E402
+import laadpaalVoorspelling as lv  # noqa: E402
+import openChargeMap as ocm  # noqa: E402
+import prijsModel as pm  # noqa: E402
+import ruimtelijkeIndex as ri  # noqa: E402
+import voertuigData as vd  # noqa: E402
+import synthetisch  # noqa: E402
+
+HISTORIE = os.path.join(HIER, "historie.json")
+
+# Laadpalen zijn er veel minder dan sessies of auto's
+POI_FACTOR = 10
+BOX_KLEUREN = ['rgb(180, 181, 0)', 'rgb(0, 171, 46)']
+
+
+def grootte(uitvoer):
+    """Bytes van een figuur als JSON, anders van het tussenresultaat."""
+    if hasattr(uitvoer, "to_json") and hasattr(uitvoer, "data"):
+        return len(uitvoer.to_json())
+    if hasattr(uitvoer, "get_root"):
+        return len(uitvoer.get_root().render())
+    if isinstance(uitvoer, pd.DataFrame):
+        return int(uitvoer.memory_usage(deep=False).sum())
+    if isinstance(uitvoer, (list, tuple)) and uitvoer and all(hasattr(u, "to_json") for u in uitvoer):
+        return sum(len(u.to_json()) for u in uitvoer)
+    return len(pickle.dumps(uitvoer, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def meet(functie, *args, geheugen=True):
+    """Tijd zonder tracing; het piekgeheugen in een tweede, getraceerde run.
+
+    tracemalloc maakt stappen met veel Python-objecten (tekst parsen) vele
+    malen trager, dus tijd en geheugen worden niet in dezelfde run gemeten.
+    """
+    begin = time.perf_counter()
+    uitvoer = functie(*args)
+    tijd = time.perf_counter() - begin
+    meting = {"tijd_s": round(tijd, 4), "uitvoer_kb": round(grootte(uitvoer) / 1024, 1)}
+
+    if geheugen:
+        tracemalloc.start()
+        functie(*args)
+        meting["piek_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024**2, 1)
+        tracemalloc.stop()
+    return uitvoer, meting
+
+
+# --- Stappen per pagina ---
+# Elke stap krijgt de context met eerder gemaakte tussenresultaten en
+# geeft zijn uitvoer terug; die gaat onder zijn naam de context in.
+
+def _laadpaal_figuren(ctx):
+    agg, laaddata, index = ctx["aggregaten"], ctx["sessies"], ctx["bezettingsindex"]
+    dag = lb.dag_uit_index(index, laaddata["Started"].min().date())
+    return [
+        lg.tijd_histogram(agg, True),
+        lg.tijd_scatter(laaddata, agg),
+        lg.energie_scatter(laaddata, agg, True),
+        *[lg.box_figuur(agg, k, BOX_KLEUREN, k, True) for k in ls.BOX_KOLOMMEN],
+    ], dag
+
+
+def _kubus_queries(ctx):
+    kubus = ctx["kubus"]
+    # Elke merk-slice bevat alleen dat merk (ook met voertuigen zonder merk)
+    for merk in kubus["cellen"]["merk"].cat.categories:
+        assert (vd.merk_cellen(kubus, merk)["merk"] == merk).all(), merk
+    totaal = vd.merk_totalen(kubus)
+    return (vd.per_merk_per_maand(kubus, totaal.nlargest(10).index),
+            vd.per_model_per_maand(kubus, totaal.index[0]),
+            vd.per_inrichting(kubus))
+
+
+def _lengte_breedte(ctx):
+    piramide = ctx["piramide"]
+    cellen, bakken = vd.piramide_cellen(piramide, max_cellen=ag.MAX_POINTS)
+    return ag.lengte_breedte_figuur(cellen, piramide["sommen"], vd.piramide_bereik(piramide), bakken)
+
+
+def _buurt_queries(ctx, aantal=100):
+    index = ctx["ruimtelijke_index"]
+    rng = np.random.default_rng(0)
+    for lat, lon in zip(rng.uniform(51, 53, aantal), rng.uniform(4, 7, aantal)):
+        ri.binnen_straal(index, lat, lon, 5)
+        ri.dichtstbij(index, lat, lon, 10)
+    return aantal
+
+
+def _kaart(ctx):
+    return kk.laadpalen_kaart("Alle provincies", ctx["laadpaal_locaties"][0])
+
+
+STAPPEN = {
+    "laadpaal": [
+        ("sessies", lambda ctx: li.schoon_sessies(li.lees_csv(ctx["csv"]))),
+        ("stream_aggregaten", lambda ctx: ls.stream_aggregaten(ctx["csv"])),
+        ("aggregaten", lambda ctx: ls.aggregeer(ctx["sessies"], bezetting=False)),
+        ("exacte_boxen", lambda ctx: ls.exacte_boxen(ctx["sessies"])),
+        ("bezettingsindex", lambda ctx: lb.bouw_index(ctx["sessies"])),
+        ("analyse", lambda ctx: la.bouw_analyse(ctx["sessies"])),
+        ("analyse_overzicht", lambda ctx: la.maand_overzicht(ctx["analyse"], ctx["bezettingsindex"])),
+        ("heatmaps", lambda ctx: (lb.week_heatmap(ctx["bezettingsindex"]),
+                                  lb.maand_heatmap(ctx["bezettingsindex"], str(ctx["sessies"]["Started"].min().to_period("M"))))),
+        ("figuren", lambda ctx: _laadpaal_figuren(ctx)[0]),
+        ("voorspelling_historie", lambda ctx: lv.historie([ctx["sessies"]], ctx["sessies"]["Started"].min(),
+                                                          ctx["sessies"]["Started"].max())),
+        ("voorspelling_train", lambda ctx: lv.train({"synthetisch": ctx["voorspelling_historie"]})),
+    ],
+    "car_data": [
+        ("voertuigen", lambda ctx: vd.bereid_voertuigen(ctx["ruwe_voertuigen"].copy())),
+        ("kubus", lambda ctx: vd.bouw_kubus(ctx["voertuigen"])),
+        ("kubus_queries", _kubus_queries),
+        ("piramide", lambda ctx: vd.bouw_piramide(ctx["voertuigen"])),
+        ("lengte_breedte", _lengte_breedte),
+    ],
+    "carsy": [
+        ("train", lambda ctx: pm.train(ctx["voertuigen"])),
+        ("online", lambda ctx: pm.online_artefacten(pm.werk_bij(pm.lege_statistiek(), ctx["voertuigen"], 0))),
+        ("predict_prices", lambda ctx: pm.predict_prices(ctx["voertuigen"], ctx["online"])),
+    ],
+    "lp_map": [
+        ("laadpalen", lambda ctx: ocm.naar_frame(ctx["pois"])),
+        ("laadpaal_locaties", lambda ctx: ocm.locaties(ctx["laadpalen"])),
+        ("ruimtelijke_index", lambda ctx: ri.bouw_index(ctx["laadpaal_locaties"][0]["AddressInfo.Latitude"],
+                                                        ctx["laadpaal_locaties"][0]["AddressInfo.Longitude"])),
+        ("buurt_queries", _buurt_queries),
+        ("kaart", _kaart),
+    ],
+    "dichtheid": [
+        ("bouw_dichtheid", lambda ctx: ld.bouw_dichtheid(ctx["voertuigen"], *ctx["laadpaal_locaties"])),
+    ],
+}
+# car_data levert de voertuigen voor carsy, lp_map de laadpalen voor dichtheid
+AFHANKELIJK = {"carsy": ["car_data"], "dichtheid": ["car_data", "lp_map"]}
+
+
+def context(n, map_):
+    csv = os.path.join(map_, "laadpaaldata.csv")
+    synthetisch.sessies(n).to_csv(csv, index=False)
+    return {
+        "csv": csv,
+        "ruwe_voertuigen": synthetisch.voertuigen(n),
+        "pois": synthetisch.pois(max(n // POI_FACTOR, 100)),
+    }
+
+
+def draai(schaal, paginas=None, geheugen=True):
+    """Meet alle stappen van de gekozen pagina's op één schaal."""
+    paginas = list(STAPPEN) if paginas is None else paginas
+    nodig = []
+    for pagina in paginas:
+        for p in AFHANKELIJK.get(pagina, []) + [pagina]:
+            if p not in nodig:
+                nodig.append(p)
+
+    uitslag = []
+    with tempfile.TemporaryDirectory() as map_:
+        ctx = context(synthetisch.SCHALEN[schaal], map_)
+        for pagina in nodig:
+            for naam, stap in STAPPEN[pagina]:
+                ctx[naam], meting = meet(stap, ctx, geheugen=geheugen)
+                if pagina in paginas:
+                    uitslag.append({"pagina": pagina, "stap": naam, **meting})
+    return uitslag
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def lees_historie(pad=HISTORIE):
+    try:
+        with open(pad, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def bewaar(runs, pad=HISTORIE):
+    historie = lees_historie(pad) + runs
+    tijdelijk = pad + ".tmp"
+    with open(tijdelijk, "w", encoding="utf-8") as f:
+        json.dump(historie, f, indent=1)
+    os.replace(tijdelijk, pad)
+
+
+def vergelijk(run, historie):
+    """Tabel van deze run naast de vorige run op dezelfde schaal."""
+    nu = pd.DataFrame(run["stappen"]).set_index(["pagina", "stap"])
+    vorige = [r for r in historie if r["schaal"] == run["schaal"] and r is not run]
+    if not vorige:
+        return nu
+    toen = pd.DataFrame(vorige[-1]["stappen"]).set_index(["pagina", "stap"])
+    return nu.assign(vorige_s=toen["tijd_s"], factor=(nu["tijd_s"] / toen["tijd_s"]).round(2))
+
+
+def _argument(naam, standaard):
+    return sys.argv[sys.argv.index(naam) + 1] if naam in sys.argv else standaard
+
+
+if __name__ == "__main__":
+    schalen = _argument("--schaal", "10k").split(",")
+    paginas = _argument("--stap", None)
+    paginas = paginas.split(",") if paginas else None
+
+    historie = lees_historie()
+    runs = []
+    for schaal in schalen:
+        run = {
+            "commit": commit(),
+            "datum": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "schaal": schaal,
+            "stappen": draai(schaal, paginas, "--zonder-geheugen" not in sys.argv),
+        }
+        runs.append(run)
+        print(f"\n== {schaal} ==")
+        print(vergelijk(run, historie).to_string())
+
+    if "--geen-historie" not in sys.argv:
+        bewaar(runs)
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import time
+
+# --- Opstarttijd per pagina ---
+# Elke meting in een vers proces: eerst alleen Control.py's eigen imports,
+# daarna de modules van één pagina, en met --render ook de eerste
+# volledige render van die pagina via streamlit's AppTest. Die render begint
+# direct op de pagina en alleen at.run() wordt gemeten. Verversing start
+# per onderdeel pas bij de eerste huidig(), dus de render meet ook het laden
+# van precies de data van die pagina; na de render wordt gecontroleerd dat
+# de zware modules van de andere pagina niet geladen zijn.
+#
+#   python benchmarks/opstart.py [--render] [--herhaal N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import paginas  # noqa: E402
+
+BASIS = "import streamlit, paginas, verversing"
+
+# Mag na de eerste render van deze pagina niet in sys.modules staan
+NIET_GELADEN = {
+    "⚡Laadpalen Data": ["sklearn", "prijsModel"],
+}
+
+RENDER = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({control!r}, default_timeout=600)
+# Direct op de gekozen pagina beginnen, zonder eerst de standaardpagina
+at.session_state["pagina"] = {pagina!r}
+begin = time.perf_counter()
+at.run()
+print(time.perf_counter() - begin)
+assert at.sidebar.radio[0].value == {pagina!r}
+assert not at.exception, [e.value for e in at.exception]
+time.sleep(2)  # verversthreads die ten onrechte gestart zijn de tijd geven
+assert not [m for m in {niet_geladen!r} if m in sys.modules], {niet_geladen!r}
+"""
+
+
+def meet(code, herhaal=3):
+    """Beste wandkloktijd (s) van code in een vers Python-proces."""
+    tijden = []
+    for _ in range(herhaal):
+        begin = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        tijden.append(time.perf_counter() - begin)
+    return min(tijden)
+
+
+def meet_render(code):
+    """Duur (s) van de render zelf, zoals het proces hem op stdout meldt."""
+    uitvoer = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout
+    return float(uitvoer.split()[-1])
+
+
+def opstart(render=False, herhaal=3):
+    uitslag = {"basis": meet(BASIS, herhaal)}
+    for pagina in paginas.PAGINAS:
+        imports = "; ".join(f"import {m}" for m in paginas.modules(pagina))
+        uitslag[f"{pagina} imports"] = meet(f"{BASIS}; {imports}", herhaal)
+        if render:
+            code = RENDER.format(control=os.path.join(ROOT, "Control.py"), pagina=pagina,
+                                 niet_geladen=NIET_GELADEN.get(pagina, []))
+            uitslag[f"{pagina} eerste render"] = meet_render(code)
+    return uitslag
+
+
+if __name__ == "__main__":
+    herhaal = int(sys.argv[sys.argv.index("--herhaal") + 1]) if "--herhaal" in sys.argv else 3
+    for naam, tijd in opstart("--render" in sys.argv, herhaal).items():
+        print(f"{naam:40s} {tijd:8.2f} s")
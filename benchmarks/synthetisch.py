@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+# --- Synthetische datasets voor de benchmarks ---
+# Zelfde kolommen en ruwe types als de echte bronnen: laadpaaldata.csv,
+# cars.pkl (RDW, alles als tekst) en de POI-JSON van OpenChargeMap.
+
+SCHALEN = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+MERKEN = {
+    "TESLA": ["MODEL 3", "MODEL Y", "MODEL S", "MODEL X"],
+    "VOLKSWAGEN": ["ID.3", "ID. 4", "ID.5", "E-GOLF", "E-UP!"],
+    "KIA": ["E-NIRO", "EV6", "NIRO EV", "E-SOUL"],
+    "HYUNDAI": ["IONIQ", "IONIQ 5", "KONA ELECTRIC"],
+    "BMW": ["I3", "I4 EDRIVE40", "IX3"],
+    "RENAULT": ["ZOE", "MEGANE E-TECH"],
+    "NISSAN": ["LEAF", "ARIYA"],
+    "PEUGEOT": ["E-208", "E-2008"],
+    "AUDI": ["E-TRON", "Q4 E-TRON"],
+    "POLESTAR": ["POLESTAR 2"],
+}
+INRICHTINGEN = ["hatchback", "sedan", "stationwagen", "MPV", "coupe", "cabriolet"]
+PROVINCIE_NAMEN = ["Utrecht", "Zuid-Holland", "North Holland", "Noord-Brabant", "Gelderland", None]
+
+
+def sessies(n, seed=42):
+    """Laadsessies als ruwe CSV-tabel (datums als tekst)."""
+    rng = np.random.default_rng(seed)
+    begin = pd.Timestamp("2018-01-01") + pd.to_timedelta(
+        np.sort(rng.uniform(0, 5 * 365 * 86400, n)).astype(np.int64), unit="s")
+    verbonden = rng.gamma(2.0, 3.0, n).round(4)
+    laden = np.minimum(verbonden, rng.gamma(1.5, 1.5, n)).round(4)
+    vermogen = rng.choice([3700, 7400, 11000, 22000, 50000], n, p=[0.3, 0.3, 0.2, 0.15, 0.05])
+    energie = (laden * vermogen * rng.uniform(0.5, 1.0, n)).round()
+
+    return pd.DataFrame({
+        "Started": begin.strftime("%Y-%m-%d %H:%M:%S"),
+        "Ended": (begin + pd.to_timedelta(verbonden * 3600, unit="s")).strftime("%Y-%m-%d %H:%M:%S"),
+        "TotalEnergy": energie,
+        "ConnectedTime": verbonden,
+        "ChargeTime": laden,
+        "MaxPower": vermogen,
+    })
+
+
+def voertuigen(n, seed=42):
+    """RDW-achtige voertuigtabel zoals cars.pkl: alle kolommen als tekst."""
+    rng = np.random.default_rng(seed)
+    merk = rng.choice(list(MERKEN), n)
+    modellen = {m: np.array(v, dtype=object) for m, v in MERKEN.items()}
+    handelsbenaming = np.empty(n, dtype=object)
+    for m, namen in modellen.items():
+        rijen = merk == m
+        handelsbenaming[rijen] = namen[rng.integers(0, len(namen), rijen.sum())]
+
+    datum = pd.Timestamp("2012-01-01") + pd.to_timedelta(rng.integers(0, 13 * 365, n), unit="D")
+
+    def tekst(waarden, ontbrekend=0.02):
+        waarden = pd.Series(waarden).astype(str).to_numpy(dtype=object)
+        waarden[rng.random(n) < ontbrekend] = None
+        return waarden
+
+    return pd.DataFrame({
+        "kenteken": [f"X{i:07d}" for i in range(n)],
+        "merk": tekst(merk, 0.01),
+        "handelsbenaming": handelsbenaming,
+        "datum_eerste_toelating": datum.strftime("%Y%m%d"),
+        "inrichting": rng.choice(INRICHTINGEN, n),
+        "catalogusprijs": tekst(rng.normal(45000, 12000, n).round().astype(int)),
+        "massa_ledig_voertuig": tekst(rng.normal(1800, 250, n).round().astype(int)),
+        "vermogen_massarijklaar": tekst(rng.uniform(0.05, 0.25, n).round(2)),
+        "lengte": tekst(rng.normal(450, 30, n).round().astype(int)),
+        "breedte": tekst(rng.normal(182, 8, n).round().astype(int)),
+        "hoogte_voertuig": tekst(rng.normal(155, 10, n).round().astype(int)),
+    })
+
+
+def pois(n, seed=42):
+    """OpenChargeMap-POI's (compact=true) verspreid over Nederland."""
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(50.8, 53.4, n)
+    lon = rng.uniform(3.4, 7.1, n)
+    vermogen = rng.choice([3.7, 11.0, 22.0, 50.0, 150.0], n)
+    provincie = rng.choice(np.array(PROVINCIE_NAMEN, dtype=object), n)
+    # Niet elke POI heeft een postcode; die worden via de ruimtelijke index aangevuld
+    postcode = [f"{p:04d} AB" if rng.random() > 0.1 else None for p in rng.integers(1000, 10000, n)]
+    gemaakt = (pd.Timestamp("2012-01-01") + pd.to_timedelta(rng.integers(0, 13 * 365, n), unit="D")).strftime(
+        "%Y-%m-%dT00:00:00Z")
+    return [
+        {
+            "ID": i,
+            "DateCreated": gemaakt[i],
+            "AddressInfo": {
+                "AddressLine1": f"Straat {i}",
+                "Postcode": postcode[i],
+                "Latitude": float(lat[i]),
+                "Longitude": float(lon[i]),
+                "StateOrProvince": provincie[i],
+            },
+            "Connections": [{"ConnectionTypeID": 25, "PowerKW": float(vermogen[i])}],
+        }
+        for i in range(n)
+    ]
@@ -0,0 +1,103 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# --- Gedeelde figuurcache ---
+# Eén cache per proces, dus gedeeld door alle Streamlit-sessies en reruns.
+# Sleutel: (naam, dataversie, widgetwaarden...); bij een nieuwe dataversie
+# worden de oude figuren vanzelf niet meer gevraagd en vallen ze er via LRU
+# uit. De cache blijft onder een geheugenbudget (geschat uit de arrays van
+# de traces, zonder de figuur te serialiseren). Figuren uit de cache niet
+# aanpassen.
+
+BUDGET_MB = float(os.environ.get("FIGUUR_CACHE_MB", "256"))
+# De grote data van een plotly-trace; de rest (layout, stijl) als vaste toeslag
+TRACE_ARRAYS = ("x", "y", "z", "text", "customdata", "lat", "lon", "values", "labels")
+TRACE_TOESLAG = 1024
+
+_slot = threading.Lock()
+_cache = OrderedDict()  # sleutel -> (waarde, bytes)
+_tellers = {"hits": 0, "misses": 0, "evicties": 0, "bytes": 0}
+_budget = int(BUDGET_MB * 1024**2)
+
+
+def _figuur_grootte(figuur):
+    n = TRACE_TOESLAG
+    for trace in figuur.data:
+        n += TRACE_TOESLAG
+        for k in TRACE_ARRAYS:
+            if k in trace and trace[k] is not None:
+                n += np.asarray(trace[k]).nbytes
+    return n
+
+
+def _grootte(waarde):
+    if hasattr(waarde, "to_json") and hasattr(waarde, "data"):  # plotly-figuur
+        return _figuur_grootte(waarde)
+    if hasattr(waarde, "memory_usage"):  # DataFrame / Series
+        return int(waarde.memory_usage(deep=True).sum())
+    if hasattr(waarde, "nbytes"):
+        return int(waarde.nbytes)
+    return len(pickle.dumps(waarde, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def stel_budget_in(mb):
+    global _budget
+    with _slot:
+        _budget = int(mb * 1024**2)
+        _ruim_op()
+
+
+def _ruim_op():
+    while _tellers["bytes"] > _budget and _cache:
+        _, (_, n) = _cache.popitem(last=False)
+        _tellers["bytes"] -= n
+        _tellers["evicties"] += 1
+
+
+def haal(sleutel, maak, grootte=_grootte):
+    """Waarde voor sleutel uit de cache, of maak() aanroepen en bewaren.
+
+    Twee sessies die tegelijk dezelfde misser hebben bouwen allebei; de
+    laatste overschrijft de eerste.
+    """
+    with _slot:
+        if sleutel in _cache:
+            _cache.move_to_end(sleutel)
+            _tellers["hits"] += 1
+            return _cache[sleutel][0]
+        _tellers["misses"] += 1
+
+    waarde = maak()
+    n = grootte(waarde)
+    if n > _budget:
+        return waarde
+
+    with _slot:
+        if sleutel in _cache:
+            _tellers["bytes"] -= _cache.pop(sleutel)[1]
+        _cache[sleutel] = (waarde, n)
+        _tellers["bytes"] += n
+        _ruim_op()
+    return waarde
+
+
+def statistiek():
+    with _slot:
+        gevraagd = _tellers["hits"] + _tellers["misses"]
+        return {
+            **_tellers,
+            "items": len(_cache),
+            "budget_mb": round(_budget / 1024**2, 1),
+            "gebruikt_mb": round(_tellers["bytes"] / 1024**2, 2),
+            "hit_ratio": round(_tellers["hits"] / gevraagd, 3) if gevraagd else None,
+        }
+
+
+def leeg():
+    with _slot:
+        _cache.clear()
+        _tellers.update(hits=0, misses=0, evicties=0, bytes=0)
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+import laadpaalBezetting as lb
+import laadpaalInlezen as li
+
+# --- Benutting en piekbelasting ---
+# Naast de bezettingsindex (aangesloten auto's) per minuut ook het aantal
+# auto's dat echt laadt en het gevraagde vermogen, plus per maand een
+# histogram van de tijd dat een auto aangesloten is zonder te laden. Alles
+# is optelbaar, dus net als bij de bezettingsindex worden alleen nieuwe
+# sessies (indexlabel > laatste_rij) erbij geteld, zolang de vingerafdruk
+# van de al getelde sessies klopt.
+#
+# Laden = [Started, Started + ChargeTime), met MaxPower als vermogen: de
+# piek is dus een bovengrens op het werkelijk gevraagde vermogen.
+
+# Bakken voor de niet-ladend-aangesloten tijd (uren)
+IDLE_BAKKEN = np.arange(0, 200.1, 0.1)
+
+
+def analyse_pad(csv_pad):
+    # laadpaaldata.csv -> laadpaaldata_analyse.npz
+    basis = csv_pad[:-4] if csv_pad.endswith(".csv") else csv_pad
+    return basis + "_analyse.npz"
+
+
+def _lege_analyse():
+    return {
+        "eerste_dag": np.datetime64("NaT"),
+        "ladend": np.zeros((0, lb.MINUTEN_PER_DAG, len(lb.LAADTYPES)), dtype=np.int16),
+        "vermogen": np.zeros((0, lb.MINUTEN_PER_DAG, len(lb.LAADTYPES)), dtype=np.float32),
+        "eerste_maand": np.int64(0),
+        "idle": np.zeros((0, len(lb.LAADTYPES), len(IDLE_BAKKEN) - 1), dtype=np.int32),
+        "laatste_rij": -1,
+    }
+
+
+def _op_plek(nieuw, oud, offset):
+    # Oude matrix op de juiste plek in het (mogelijk grotere) bereik optellen
+    nieuw[offset:offset + oud.shape[0]] += oud
+    return nieuw
+
+
+def bouw_analyse(laaddata, analyse=None):
+    """Bouw de analyse op, of werk een bestaande bij met alleen de nieuwe sessies."""
+    nieuw = laaddata if analyse is None else laaddata[laaddata.index > analyse["laatste_rij"]]
+    if nieuw.empty:
+        return analyse if analyse is not None else _lege_analyse()
+    bestaand = analyse is not None and analyse["ladend"].shape[0] > 0
+
+    begin = nieuw["Started"].dt.round("min")
+    eind_laden = (nieuw["Started"] + pd.to_timedelta(nieuw["ChargeTime"].astype("float64"), unit="h")).dt.round("min")
+    soort = nieuw["AC or DC?"].to_numpy()
+
+    # --- Per minuut: ladend en vermogen ---
+    eerste = nieuw["Started"].min().normalize()
+    laatste = eind_laden.max().normalize() + pd.Timedelta(days=1)
+    if bestaand:
+        eerste = min(eerste, pd.Timestamp(analyse["eerste_dag"]))
+        laatste = max(laatste, pd.Timestamp(analyse["eerste_dag"]) + pd.Timedelta(days=analyse["ladend"].shape[0]))
+
+    raster = pd.date_range(eerste, laatste, freq="1min", inclusive="left").to_numpy(dtype="datetime64[ns]")
+    stap = pd.Timedelta(minutes=1).to_timedelta64()
+    b = begin.to_numpy(dtype="datetime64[ns]")
+    e = eind_laden.to_numpy(dtype="datetime64[ns]") + stap
+    vorm = (-1, lb.MINUTEN_PER_DAG, len(lb.LAADTYPES))
+
+    ladend = lb.bezetting_matrix(b, e, soort, raster, lb.LAADTYPES).reshape(vorm)
+    vermogen = lb.bezetting_matrix(b, e, soort, raster, lb.LAADTYPES,
+                                   gewicht=nieuw["MaxPower"].to_numpy(dtype="float64") / 1000).reshape(vorm)
+
+    # --- Per maand: histogram van aangesloten-maar-niet-ladend ---
+    maand = nieuw["Started"].dt.to_period("M").array.asi8
+    eerste_maand, laatste_maand = maand.min(), maand.max()
+    if bestaand:
+        eerste_maand = min(eerste_maand, int(analyse["eerste_maand"]))
+        laatste_maand = max(laatste_maand, int(analyse["eerste_maand"]) + analyse["idle"].shape[0] - 1)
+
+    idle_uren = np.clip((nieuw["ConnectedTime"].astype("float64") - nieuw["ChargeTime"].astype("float64")).to_numpy(),
+                        IDLE_BAKKEN[0], IDLE_BAKKEN[-1] - 1e-9)
+    bak = np.searchsorted(IDLE_BAKKEN, idle_uren, side="right") - 1
+    type_code = pd.Categorical(soort, categories=lb.LAADTYPES).codes
+    n_bakken = len(IDLE_BAKKEN) - 1
+    cel = ((maand - eerste_maand) * len(lb.LAADTYPES) + type_code) * n_bakken + bak
+    n_maanden = int(laatste_maand - eerste_maand + 1)
+    idle = np.bincount(cel[type_code >= 0], minlength=n_maanden * len(lb.LAADTYPES) * n_bakken).reshape(
+        n_maanden, len(lb.LAADTYPES), n_bakken)
+
+    if bestaand:
+        offset = (pd.Timestamp(analyse["eerste_dag"]) - eerste).days
+        ladend = _op_plek(ladend, analyse["ladend"], offset)
+        vermogen = _op_plek(vermogen, analyse["vermogen"], offset)
+        idle = _op_plek(idle, analyse["idle"], int(analyse["eerste_maand"]) - eerste_maand)
+
+    return {
+        "eerste_dag": eerste.to_datetime64(),
+        "ladend": lb.compacte_tellingen(ladend),
+        # Kleine afrondingsresten van de cumsum weg
+        "vermogen": np.round(vermogen, 3).astype(np.float32),
+        "eerste_maand": np.int64(eerste_maand),
+        "idle": idle.astype(np.int32),
+        "laatste_rij": int(laaddata.index.max()),
+    }
+
+
+def laad_analyse(laaddata, pad, hashes=None):
+    """Zelfde aanpak als laadpaalBezetting.laad_index (li.laad_incrementeel), voor de analyse."""
+    def lees():
+        with np.load(pad) as bestand:
+            analyse = {k: bestand[k] for k in [*_lege_analyse(), "vingerafdruk"]}
+        analyse["eerste_dag"] = analyse["eerste_dag"][()]
+        analyse["eerste_maand"] = analyse["eerste_maand"][()]
+        analyse["laatste_rij"] = int(analyse["laatste_rij"])
+        analyse["vingerafdruk"] = str(analyse["vingerafdruk"])
+        return analyse
+
+    return li.laad_incrementeel(laaddata, lees, bouw_analyse, lambda analyse: li.bewaar_npz(pad, analyse), hashes)
+
+
+# --- Uitkomsten ---
+
+def _kolommen(types):
+    return [lb.LAADTYPES.index(t) for t in (lb.LAADTYPES if types is None else types)]
+
+
+def _dagen(analyse):
+    return pd.date_range(pd.Timestamp(analyse["eerste_dag"]), periods=analyse["ladend"].shape[0], freq="D")
+
+
+def uur_van_week(analyse, index, grootheid, types=None):
+    """Gemiddelde per weekdag x uur van "aangesloten", "ladend", "vermogen"
+    (kW) of "benutting" (ladend / aangesloten)."""
+    if grootheid == "aangesloten":
+        return lb.week_heatmap(index, types)
+    if grootheid == "benutting":
+        aangesloten = lb.week_heatmap(index, types)
+        return uur_van_week(analyse, index, "ladend", types) / aangesloten.where(aangesloten > 0)
+    return lb.week_heatmap({"eerste_dag": analyse["eerste_dag"], "matrix": analyse[grootheid]}, types)
+
+
+def piek_per_dag(analyse, types=None):
+    """Hoogste gelijktijdig gevraagde vermogen (kW) per dag."""
+    per_minuut = analyse["vermogen"][:, :, _kolommen(types)].sum(axis=2, dtype=np.float64)
+    return pd.Series(per_minuut.max(axis=1), index=_dagen(analyse), name="Piekvermogen (kW)")
+
+
+def _idle_kwantielen(tellingen, qs):
+    cum = np.cumsum(tellingen, axis=-1)
+    totaal = cum[..., -1:]
+    uitkomst = []
+    for q in qs:
+        bak = (cum < np.maximum(q * totaal, 1)).sum(axis=-1)
+        waarde = IDLE_BAKKEN[np.minimum(bak, len(IDLE_BAKKEN) - 2)] + 0.05
+        uitkomst.append(np.where(totaal[..., 0] > 0, waarde, np.nan))
+    return uitkomst
+
+
+def maand_overzicht(analyse, index, types=None, qs=(0.5, 0.9, 0.95)):
+    """Per maand: piekvermogen (max en percentielen van de dagpieken),
+    gemiddeld aangesloten en ladend, benutting en percentielen van de tijd
+    aangesloten zonder te laden."""
+    kolommen = _kolommen(types)
+    piek = piek_per_dag(analyse, types)
+    ladend = pd.Series(analyse["ladend"][:, :, kolommen].sum(axis=2, dtype=np.float64).mean(axis=1), index=_dagen(analyse))
+    dagen_index = pd.date_range(pd.Timestamp(index["eerste_dag"]), periods=index["matrix"].shape[0], freq="D")
+    aangesloten = pd.Series(index["matrix"][:, :, kolommen].sum(axis=2, dtype=np.float64).mean(axis=1), index=dagen_index)
+
+    maand = piek.index.to_period("M")
+    tabel = piek.groupby(maand).agg(["max"] + [lambda s, q=q: s.quantile(q) for q in qs])
+    tabel.columns = ["Piek kW"] + [f"Dagpiek p{round(q * 100)} kW" for q in qs]
+    tabel["Gem. ladend"] = ladend.groupby(maand).mean()
+    tabel["Gem. aangesloten"] = aangesloten.groupby(aangesloten.index.to_period("M")).mean()
+    tabel["Benutting"] = tabel["Gem. ladend"] / tabel["Gem. aangesloten"]
+
+    maanden = pd.PeriodIndex.from_ordinals(int(analyse["eerste_maand"]) + np.arange(analyse["idle"].shape[0]), freq="M")
+    idle = _idle_kwantielen(analyse["idle"][:, kolommen].sum(axis=1), qs)
+    for q, waarden in zip(qs, idle):
+        tabel[f"Niet-ladend p{round(q * 100)} (uur)"] = pd.Series(waarden, index=maanden)
+
+    tabel.index = tabel.index.astype(str)
+    tabel.index.name = "Maand"
+    return tabel
@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+
+import laadpaalInlezen as li
+import profiel
+
+# De twee laadtypes die laadpaalData afleidt uit TotalEnergy / ChargeTime
+LAADTYPES = ["AC", "DC"]
+
+
+def bezetting(laaddata, start, eind, freq="1min", types=None):
+    """Aantal aangesloten auto's per tijdstap en per AC/DC tussen start en eind.
+
+    Elke sessie wordt een +1 op het (afgeronde) begin en een -1 direct na het
+    (afgeronde) einde; een cumsum over het tijdraster geeft dan het aantal
+    gelijktijdige sessies. Geeft hetzelfde frame als de lijngrafiek in
+    laadpaalData gebruikt: Minuut, AC or DC?, Aantal_autos.
+    """
+    if types is None:
+        types = LAADTYPES
+
+    raster = pd.date_range(pd.Timestamp(start), pd.Timestamp(eind), freq=freq, inclusive="left")
+    stap = pd.Timedelta(freq)
+
+    # Afronden op de tijdstap anders tellen halve minuten dubbel #
+    begin = laaddata["Started"].dt.round(stap).to_numpy(dtype="datetime64[ns]")
+    einde = laaddata["Ended"].dt.round(stap).to_numpy(dtype="datetime64[ns]") + stap.to_timedelta64()
+    soort = laaddata["AC or DC?"].to_numpy()
+
+    tellingen = bezetting_matrix(begin, einde, soort, raster.to_numpy(dtype="datetime64[ns]"), types)
+
+    # Zelfde volgorde als MultiIndex.from_product([minuten, types])
+    return pd.DataFrame({
+        "Minuut": np.repeat(raster, len(types)),
+        "AC or DC?": np.tile(np.asarray(types, dtype=object), len(raster)),
+        "Aantal_autos": tellingen.reshape(-1),
+    })
+
+
+def bezetting_matrix(begin, einde, soort, raster, types, gewicht=None):
+    """Kale NumPy-versie: int32-matrix (len(raster), len(types)).
+
+    begin/einde zijn datetime64-arrays waarbij einde exclusief is, raster is
+    het oplopende tijdraster waarop geteld wordt. Met gewicht (bijv. het
+    vermogen per sessie) wordt dat gewicht opgeteld in plaats van 1, en is
+    de matrix float64.
+    """
+    n = len(raster)
+    tellingen = np.zeros((n, len(types)), dtype=np.int32 if gewicht is None else np.float64)
+
+    geldig = einde > begin
+    for k, t in enumerate(types):
+        sel = geldig & (soort == t)
+        w = None if gewicht is None else gewicht[sel]
+        # Sessies die voor het raster beginnen tellen vanaf index 0,
+        # sessies die erna eindigen vallen op index n en worden weggelaten
+        i = np.searchsorted(raster, begin[sel], side="left")
+        j = np.searchsorted(raster, einde[sel], side="left")
+        delta = np.bincount(i, weights=w, minlength=n + 1) - np.bincount(j, weights=w, minlength=n + 1)
+        tellingen[:, k] = np.cumsum(delta[:n])
+
+    return tellingen
+
+
+# --- Bezettingsindex per dag ---
+# matrix[dag, minuut_van_de_dag, type] met het aantal aangesloten auto's,
+# zodat een datum kiezen alleen nog een slice is.
+MINUTEN_PER_DAG = 24 * 60
+
+
+def compacte_tellingen(matrix):
+    """int16 als alle tellingen erin passen, anders int32.
+
+    Bij exports van honderden miljoenen sessies komen gelijktijdige
+    aantallen boven 32767; een vaste int16 zou dan stil overlopen.
+    """
+    if matrix.size and matrix.max() > np.iinfo(np.int16).max:
+        return matrix.astype(np.int32)
+    return matrix.astype(np.int16)
+
+
+def index_pad(csv_pad):
+    # Index staat naast de CSV: laadpaaldata.csv -> laadpaaldata_bezetting.npz
+    basis = csv_pad[:-4] if csv_pad.endswith(".csv") else csv_pad
+    return basis + "_bezetting.npz"
+
+
+@profiel.gemeten("lb.bouw_index")
+def bouw_index(laaddata, index=None):
+    """Bouw de bezettingsindex op, of werk een bestaande index bij.
+
+    Bij een bestaande index worden alleen de rijen met een hoger
+    (CSV-)indexlabel dan index["laatste_rij"] toegevoegd; bezetting is
+    optelbaar dus nieuwe sessies kunnen gewoon bij de matrix opgeteld worden.
+    """
+    if index is not None:
+        nieuw = laaddata[laaddata.index > index["laatste_rij"]]
+    else:
+        nieuw = laaddata
+
+    if nieuw.empty:
+        return index if index is not None else _lege_index()
+
+    eerste = nieuw["Started"].min().normalize()
+    laatste = nieuw["Ended"].max().normalize() + pd.Timedelta(days=1)
+    if index is not None and index["matrix"].shape[0] > 0:
+        eerste = min(eerste, pd.Timestamp(index["eerste_dag"]))
+        laatste = max(laatste, pd.Timestamp(index["eerste_dag"]) + pd.Timedelta(days=index["matrix"].shape[0]))
+
+    raster = pd.date_range(eerste, laatste, freq="1min", inclusive="left")
+    stap = pd.Timedelta(minutes=1).to_timedelta64()
+    tellingen = bezetting_matrix(
+        nieuw["Started"].dt.round("min").to_numpy(dtype="datetime64[ns]"),
+        nieuw["Ended"].dt.round("min").to_numpy(dtype="datetime64[ns]") + stap,
+        nieuw["AC or DC?"].to_numpy(),
+        raster.to_numpy(dtype="datetime64[ns]"),
+        LAADTYPES,
+    )
+    matrix = tellingen.reshape(-1, MINUTEN_PER_DAG, len(LAADTYPES))
+
+    if index is not None and index["matrix"].shape[0] > 0:
+        # Oude matrix op de juiste plek in het (mogelijk grotere) bereik optellen
+        offset = (pd.Timestamp(index["eerste_dag"]) - eerste).days
+        matrix[offset:offset + index["matrix"].shape[0]] += index["matrix"]
+
+    return {
+        "eerste_dag": eerste.to_datetime64(),
+        "matrix": compacte_tellingen(matrix),
+        "laatste_rij": int(laaddata.index.max()),
+    }
+
+
+def _lege_index():
+    return {
+        "eerste_dag": np.datetime64("NaT"),
+        "matrix": np.zeros((0, MINUTEN_PER_DAG, len(LAADTYPES)), dtype=np.int16),
+        "laatste_rij": -1,
+    }
+
+
+def laad_index(laaddata, pad, hashes=None):
+    """Lees de index van schijf, voeg nieuwe sessies toe en sla hem weer op.
+
+    hashes is li.rij_hashes(laaddata), als die al berekend is.
+    """
+    def lees():
+        with np.load(pad) as bestand:
+            return {
+                "eerste_dag": bestand["eerste_dag"][()],
+                "matrix": bestand["matrix"],
+                "laatste_rij": int(bestand["laatste_rij"]),
+                "vingerafdruk": str(bestand["vingerafdruk"]),
+            }
+
+    return li.laad_incrementeel(laaddata, lees, bouw_index, lambda index: li.bewaar_npz(pad, index), hashes)
+
+
+def dag_uit_index(index, dag):
+    """Zelfde frame als bezetting() voor een dag, maar als slice uit de index."""
+    dag = pd.Timestamp(dag).normalize()
+    minuten = pd.date_range(dag, periods=MINUTEN_PER_DAG, freq="1min")
+
+    i = (dag - pd.Timestamp(index["eerste_dag"])).days if index["matrix"].shape[0] else -1
+    if 0 <= i < index["matrix"].shape[0]:
+        tellingen = index["matrix"][i]
+    else:
+        tellingen = np.zeros((MINUTEN_PER_DAG, len(LAADTYPES)), dtype=np.int16)
+
+    return pd.DataFrame({
+        "Minuut": np.repeat(minuten, len(LAADTYPES)),
+        "AC or DC?": np.tile(np.asarray(LAADTYPES, dtype=object), MINUTEN_PER_DAG),
+        "Aantal_autos": tellingen.reshape(-1),
+    })
+
+
+def _uur_per_dag(index, types):
+    # Gemiddeld aantal auto's per uur: (dagen, 24)
+    kolommen = [LAADTYPES.index(t) for t in types]
+    per_minuut = index["matrix"][:, :, kolommen].sum(axis=2, dtype=np.float64)
+    return per_minuut.reshape(-1, 24, 60).mean(axis=2)
+
+
+def week_heatmap(index, types=None):
+    """Gemiddelde bezetting per weekdag x uur over de hele index."""
+    types = LAADTYPES if types is None else types
+    per_uur = _uur_per_dag(index, types)
+    dagen = pd.date_range(pd.Timestamp(index["eerste_dag"]), periods=per_uur.shape[0], freq="D")
+
+    return (
+        pd.DataFrame(per_uur, index=dagen.dayofweek, columns=range(24))
+        .groupby(level=0).mean()
+        .reindex(range(7))
+        .rename(index=dict(enumerate(["ma", "di", "wo", "do", "vr", "za", "zo"])))
+    )
+
+
+def maand_heatmap(index, maand, types=None):
+    """Gemiddelde bezetting per dag van de maand x uur voor één maand."""
+    types = LAADTYPES if types is None else types
+    maand = pd.Period(maand, freq="M")
+    eerste = pd.Timestamp(index["eerste_dag"])
+
+    dagen = pd.date_range(maand.start_time, maand.end_time.normalize(), freq="D")
+    i = (dagen - eerste).days.to_numpy()
+    binnen = (i >= 0) & (i < index["matrix"].shape[0])
+
+    per_uur = np.zeros((len(dagen), 24))
+    if binnen.any():
+        per_uur[binnen] = _uur_per_dag({"matrix": index["matrix"][i[binnen]]}, types)
+
+    return pd.DataFrame(per_uur, index=dagen.day, columns=range(24))
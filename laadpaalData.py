@@ -1,35 +1,97 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 
 import GeodataEnCars as gc
+import figuurCache as fc
+import laadpaalAnalyse as la
+import laadpaalBezetting as lb
+import laadpaalGrafieken as lg
+import laadpaalVoorspelling as lv
+import profiel
+import verversing
 
 def laadpaal():
     ## DATA INLADEN ##
-    laaddata = pd.read_csv("laadpaaldata.csv")
     
-    st.set_page_config(layout="wide")
-    st.title("⚡Laadpaal Statistieken")
-    
-    ## DATUMS OMZETTEN NAAR DATETIME ##
-    laaddata["Started"] = pd.to_datetime(laaddata["Started"], format='%Y-%m-%d %H:%M:%S', errors='coerce')
-    laaddata["Ended"] = pd.to_datetime(laaddata["Ended"], format='%Y-%m-%d %H:%M:%S', errors='coerce')
-    laaddata = laaddata.dropna(subset=["Started"])
-    laaddata = laaddata.dropna(subset=["Ended"])
+    # Sessies, aggregaten en indexen komen uit de momentopname die verversing #
+    # op de achtergrond bijhoudt; grote exports zijn daar al gestreamd #
+    with profiel.stap("laadpaal: momentopname"):
+        momentopname = verversing.huidig("laadpaal")
+    data = momentopname["data"]
+    laaddata, agg, index, benutting = data["laaddata"], data["agg"], data["index"], data["analyse"]
+    eerste, laatste = data["eerste"], data["laatste"]
     
-    # Gooi alles onder 0 chargetime weg want dat klopt niet #
-    laaddata = laaddata[laaddata["ChargeTime"] >= 0]
+    # Figuren komen uit de gedeelde cache, per (versie van de CSV, widgetwaarden) #
+    versie = momentopname["versie"]
     
-    # Voeg een nieuwe kolom toe die zegt of binnen een sessie een auto volledig werdt opgeladen #
-    laaddata["FullyCharged?"] = laaddata["ChargeTime"] != laaddata["ConnectedTime"]
+    # Voorspelde bezetting en kWh per uur, ook op de achtergrond getraind #
+    with profiel.stap("laadpaal: voorspelling"):
+        voorspelling_opname = verversing.huidig("voorspelling")
+    voorspelling, voorspelling_versie = voorspelling_opname["data"], voorspelling_opname["versie"]
+    bron = lv.bron_naam(verversing.LAADDATA)
     
-    laaddata["AC or DC?"] = "DC"
-    laaddata.loc[((laaddata["TotalEnergy"]/1000) / laaddata["ChargeTime"]) < 4, "AC or DC?"] = "AC"
+    st.set_page_config(layout="wide")
+    st.title("⚡Laadpaal Statistieken")
     
     # Maak wat tabbladen #
-    tab1, tab2, tab3 = st.tabs(["⚡Energie Verbruik","🕓 Tijd aan de laadpaal", "🚩 Geodata Laadpalen"])
+    tab1, tab2, tab3, tab4 = st.tabs(["⚡Energie Verbruik","🕓 Tijd aan de laadpaal", "🚩 Geodata Laadpalen",
+                                      "📈 Benutting en piekvermogen"])
     
-    with tab3:
+    with tab4:
+        st.subheader("Per uur van de week", divider="violet")
+        
+        benut_types = st.multiselect("Laadtype:", lb.LAADTYPES, default=lb.LAADTYPES, key='benut_types')
+        grootheid = st.radio("Toon:", ["benutting", "ladend", "aangesloten", "vermogen"], horizontal=True,
+                             key='benut_grootheid')
+        labels = {"benutting": "Ladend / aangesloten", "ladend": "Aantal ladend",
+                  "aangesloten": "Aantal autos", "vermogen": "kW"}
+        
+        with profiel.stap("laadpaal: benutting"):
+            fig_benut = fc.haal(("benutting", versie, grootheid, tuple(benut_types)), lambda: lg.uur_van_week_figuur(
+                la.uur_van_week(benutting, index, grootheid, benut_types),
+                f"Gemiddeld per weekdag en uur: {grootheid}", labels[grootheid]))
+        st.plotly_chart(fig_benut)
+        
+        ## PIEKVERMOGEN ##
+        st.subheader("Piekvermogen", divider="red")
+        with profiel.stap("laadpaal: piekvermogen"):
+            fig_piek = fc.haal(("piek_per_dag", versie, tuple(benut_types)),
+                               lambda: lg.piek_figuur(la.piek_per_dag(benutting, benut_types)))
+            overzicht = fc.haal(("maand_overzicht", versie, tuple(benut_types)),
+                                lambda: la.maand_overzicht(benutting, index, benut_types))
+            fig_piek_maand = fc.haal(("piek_per_maand", versie, tuple(benut_types)), lambda: lg.overzicht_figuur(
+                overzicht, ["Piek kW", "Dagpiek p95 kW", "Dagpiek p50 kW"], "Piekvermogen per maand", "kW"))
+        st.plotly_chart(fig_piek)
+        st.plotly_chart(fig_piek_maand)
+        
+        ## AANGESLOTEN ZONDER TE LADEN ##
+        st.subheader("Aangesloten zonder te laden", divider="orange")
+        fig_idle = fc.haal(("niet_ladend", versie, tuple(benut_types)), lambda: lg.overzicht_figuur(
+            overzicht, [k for k in overzicht.columns if k.startswith("Niet-ladend")],
+            "ConnectedTime − ChargeTime per maand", "Uur"))
+        st.plotly_chart(fig_idle)
+        st.dataframe(overzicht.round(2))
+        
+        ## VOORSPELLING ##
+        st.subheader(f"Voorspelling komende {voorspelling['horizon_dagen']} dagen", divider="blue")
+        
+        kwaliteit = voorspelling["kwaliteit"]
+        col1, col2 = st.columns(2)
+        voorspel_bron = col1.radio("Bron:", list(kwaliteit["bron"].unique()), horizontal=True, key='voorspel_bron')
+        voorspel_grootheid = col2.radio("Toon:", lv.GROOTHEDEN, horizontal=True, key='voorspel_grootheid',
+                                        format_func={"aangesloten": "Aantal autos", "kwh": "kWh per uur"}.get)
+        
+        with profiel.stap("laadpaal: voorspelling figuur"):
+            fig_voorspelling = fc.haal(("voorspelling", voorspelling_versie, voorspel_bron, voorspel_grootheid),
+                                       lambda: lg.voorspelling_figuur(
+                                           lv.segment(voorspelling["voorspelling"], voorspel_bron, voorspel_grootheid),
+                                           f"Voorspelling per uur: {voorspel_bron}",
+                                           "kWh" if voorspel_grootheid == "kwh" else "Aantal autos"))
+        st.plotly_chart(fig_voorspelling)
+        st.caption("Backtest op de laatste twee weken (gemiddelde absolute fout per uur)")
+        st.dataframe(kwaliteit.round(3), hide_index=True)
+    
+    with tab3, profiel.stap("lp_map"):
         gc.lp_map()
     
     with tab2:
@@ -40,114 +102,57 @@ def laadpaal():
         # Logaritmische knop #
         st.checkbox("Logaritmische schaal", key='log_scale_hist', value=True)
         
-        ld_long = laaddata.melt(
-            id_vars=["AC or DC?"],
-            value_vars=["ConnectedTime","ChargeTime"],
-            var_name="Type",
-            value_name="Time"
-            )
-        
-        ld_long["Legenda"] = ld_long["Type"] + "_" + ld_long["AC or DC?"].astype(str)
-
-    
-        LDhist = px.histogram(ld_long,
-                              x="Time",
-                              color="Legenda",
-                              barmode="overlay",
-                              opacity=0.65,
-                              labels={"Time": "Tijd in uur"})
-        
-        # Hierdoor werkt die logaritmische knop #
-        LDhist.update_yaxes(type="log" if st.session_state.log_scale_hist else "linear")
+        # Histogram uit vaste bakken in plaats van de hele dataset te melten #
+        with profiel.stap("laadpaal: tijd_histogram"):
+            LDhist = fc.haal(("tijd_histogram", versie, st.session_state.log_scale_hist),
+                             lambda: lg.tijd_histogram(agg, st.session_state.log_scale_hist))
         
         st.plotly_chart(LDhist)
         
         st.subheader("Scatterplot", divider="green")
         
         ## SCATTERPLOT ConnectedTime x ChargeTime ##
-        laaddata["charge_type"] = laaddata["FullyCharged?"].astype(str) + " - " + laaddata["AC or DC?"].astype(str)
-        
-        LDscatter = px.scatter(laaddata,
-                     y="ConnectedTime",
-                     x="ChargeTime",
-                     color="charge_type",
-                     color_discrete_sequence=['rgb(186, 31, 28)',
-                                              'rgb(50, 168, 82)',
-                                              'rgb(173, 102, 43)',
-                                              'rgb(191, 179, 48)'],
-                     opacity=0.65,
-                     labels={"ConnectedTime": "Tijd verbonden",
-                             "ChargeTime": "Tijd aan het opladen",
-                             "FullyCharged?": "Volledig opgeladen?"})
+        # WebGL, uitgedund per rastercel; bij heel veel sessies alleen de dichtheid #
+        with profiel.stap("laadpaal: tijd_scatter"):
+            LDscatter = fc.haal(("tijd_scatter", versie), lambda: lg.tijd_scatter(laaddata, agg))
         
         st.plotly_chart(LDscatter)
         
         ## HOEVEELHEID AUTOS AAN DE LAADPAAL PER DAG ##
         st.subheader("Hoeveel auto's hangen aan de laadpaal?", divider="violet")
         
-        # Dagselectie #
-        datum_filter = laaddata['Started'].dt.date
+        # Dagselectie, tot en met de laatste voorspelde dag #
         select_date = st.date_input("Kies een datum:",
-                                      value= datum_filter.min(),
-                                      min_value=datum_filter.min(),
-                                      max_value=datum_filter.max())
-        
-        # Alleen de data van de geselecteerde dag #
-        laaddata_dag = laaddata[
-            (laaddata['Started'].dt.normalize() == pd.to_datetime(select_date)) |
-            (laaddata['Ended'].dt.normalize() == pd.to_datetime(select_date))
-        ].copy()
-        
-        # Afronden op de minuut anders duurt het heel lang #
-        laaddata_dag['Started'] = laaddata_dag['Started'].dt.round("min")
-        laaddata_dag['Ended'] = laaddata_dag['Ended'].dt.round("min")
-        
-        laaddata_dag['Minuut'] = laaddata_dag.apply(
-            lambda rij: list(pd.date_range(start=rij['Started'], end=rij['Ended'], freq="1min")),
-            axis=1
-        )
-    
-        laadpaal_min = (
-            laaddata_dag.explode('Minuut')
-            .groupby(['Minuut','AC or DC?'])
-            .apply(lambda df: df.index.nunique())
-            .reset_index(name='Aantal_autos')
-        )
-        
-        # Plot echt alleen de dag die geselecteerd is #
-        dag_om_te_plotten = pd.Timestamp(select_date)
-        laadpaal_dag = laadpaal_min[(laadpaal_min['Minuut'] >= dag_om_te_plotten) & 
-                    (laadpaal_min['Minuut'] < dag_om_te_plotten + pd.Timedelta(days=1))]
-
-        # Alle unieke laadtypes (AC/DC)
-        types = laaddata_dag["AC or DC?"].unique()
-        
-        # Combineer alle minuten met elk type
-        volledige_tijdreeks = pd.MultiIndex.from_product(
-            [pd.date_range(dag_om_te_plotten, dag_om_te_plotten + pd.Timedelta(days=1) - pd.Timedelta(minutes=1), freq="1min"),
-             types],
-            names=["Minuut", "AC or DC?"]
-        ).to_frame(index=False)
-        
-        # Merge met echte data
-        laadpaal_dag = (
-            volledige_tijdreeks
-            .merge(laadpaal_min, on=["Minuut", "AC or DC?"], how="left")
-            .fillna({"Aantal_autos": 0})
-        )
-
-        aan_laadpaal = px.line(laadpaal_dag,
-                               x='Minuut',
-                               y='Aantal_autos',
-                               color= "AC or DC?",
-                               color_discrete_sequence=['rgb(102, 40, 166)', 'rgb(235, 52, 201)'],
-                               title=f'Aantal aangesloten auto’s op {select_date}',
-                               labels={"Minuut": "Tijd",
-                                       "Aantal_autos": "Aantal Aangesloten Autos"})
-        
-        aan_laadpaal.update_layout(yaxis_range=[0,20])
+                                      value= eerste.date(),
+                                      min_value=eerste.date(),
+                                      max_value=(laatste.normalize() + pd.Timedelta(
+                                          days=voorspelling["horizon_dagen"])).date())
+        
+        # Aantal aangesloten auto's per minuut, als slice uit de bezettingsindex, #
+        # met de voorspelde band als de dag in de voorspelling valt #
+        with profiel.stap("laadpaal: dag_uit_index"):
+            aan_laadpaal = fc.haal(("dag", versie, voorspelling_versie, select_date), lambda: lg.dag_figuur(
+                lb.dag_uit_index(index, select_date), select_date,
+                lv.segment(voorspelling["voorspelling"], bron, "aangesloten",
+                           select_date, pd.Timestamp(select_date) + pd.Timedelta(days=1))))
         st.plotly_chart(aan_laadpaal)
         
+        ## HEATMAPS BEZETTING PER WEEK EN MAAND ##
+        st.subheader("Bezetting per week en per maand", divider="violet")
+        
+        heat_types = st.multiselect("Laadtype:", lb.LAADTYPES, default=lb.LAADTYPES, key='heat_types')
+        
+        fig_week = fc.haal(("week", versie, tuple(heat_types)),
+                           lambda: lg.week_figuur(lb.week_heatmap(index, heat_types)))
+        st.plotly_chart(fig_week)
+        
+        maanden = pd.period_range(eerste, laatste, freq="M")
+        select_maand = st.selectbox("Kies een maand:", maanden.astype(str), key='heat_maand')
+        
+        fig_maand = fc.haal(("maand", versie, select_maand, tuple(heat_types)),
+                            lambda: lg.maand_figuur(lb.maand_heatmap(index, select_maand, heat_types), select_maand))
+        st.plotly_chart(fig_maand)
+        
     with tab1:
         st.subheader("Scatterplot", divider="red")
         
@@ -155,19 +160,10 @@ def laadpaal():
         st.checkbox("Trendlijn", key='trendline_LD', value=True)
         
         ## SCATTERPLOT TotalEnergy x ChargeTime ##
-        LDscatter = px.scatter(laaddata,
-                     x="ChargeTime",
-                     y="TotalEnergy",
-                     color="AC or DC?",
-                     color_discrete_sequence=['rgb(188, 189, 34)', 'rgb(50, 168, 82)'],
-                     trendline="ols" if st.session_state.trendline_LD else None,
-                     opacity=0.75,
-                     labels={"ChargeTime": "Tijd aan het opladen",
-                             "TotalEnergy": "Totaal verbruikte<br>energie in Wh",
-                             "FullyCharged?": "Volledig opgeladen?",
-                             "AC or DC?": "Predicted AC or DC"})
-        
-        LDscatter.update_yaxes(range=[0,87500])
+        with profiel.stap("laadpaal: energie_scatter"):
+            LDscatter = fc.haal(("energie_scatter", versie, st.session_state.trendline_LD),
+                                lambda: lg.energie_scatter(laaddata, agg, st.session_state.trendline_LD))
+        
         st.plotly_chart(LDscatter)
         
         ## BOXPLOTS ##
@@ -183,16 +179,10 @@ def laadpaal():
             # Checkbox die automatisch session_state bijwerkt
             st.checkbox("Logaritmische schaal", key='log_scale_CT', value=True)
             
-            fig_CT = px.box(laaddata,
-                             x="AC or DC?",
-                             y="ChargeTime",
-                             color="AC or DC?",
-                             color_discrete_sequence=['rgb(180, 181, 0)', 'rgb(0, 171, 46)'],
-                             labels={"ChargeTime": "Tijd aan het opladen",
-                                     "AC or DC?": "Predicted AC or DC"}
-                             )
-            fig_CT.update_yaxes(type="log" if st.session_state.log_scale_CT else "linear")
-            fig_CT.update_layout(yaxis=dict(range=[0,None]))
+            # Boxplot uit de vijfgetallensamenvatting, niet uit alle punten #
+            fig_CT = fc.haal(("box", versie, "ChargeTime", st.session_state.log_scale_CT),
+                             lambda: lg.box_figuur(agg, "ChargeTime", *lg.BOXEN["ChargeTime"],
+                                                   st.session_state.log_scale_CT))
             st.plotly_chart(fig_CT, use_container_width=True)
         
         with col1:
@@ -202,16 +192,10 @@ def laadpaal():
             # Checkbox die automatisch session_state bijwerkt
             st.checkbox("Logaritmische schaal", key='log_scale_TE', value=True)
             
-            fig_TE = px.box(laaddata,
-                             y="TotalEnergy",
-                             x="AC or DC?",
-                             color="AC or DC?",
-                             color_discrete_sequence=['rgb(193, 194, 70)', 'rgb(90, 176, 113)'],
-                             labels={"TotalEnergy": "Totaal verbruikte<br>energie in Wh",
-                                     "AC or DC?": "Predicted AC or DC"}  
-                             )
-            fig_TE.update_yaxes(type="log" if st.session_state.log_scale_TE else "linear")
-            fig_TE.update_layout(yaxis=dict(range=[0,None]))
+            # Boxplot uit de vijfgetallensamenvatting, niet uit alle punten #
+            fig_TE = fc.haal(("box", versie, "TotalEnergy", st.session_state.log_scale_TE),
+                             lambda: lg.box_figuur(agg, "TotalEnergy", *lg.BOXEN["TotalEnergy"],
+                                                   st.session_state.log_scale_TE))
             st.plotly_chart(fig_TE, use_container_width=True)
 
         with col3:
@@ -221,14 +205,8 @@ def laadpaal():
             # Checkbox die automatisch session_state bijwerkt
             st.checkbox("Logaritmische schaal", key='log_scale_MP', value=True)
             
-            fig_MP = px.box(laaddata,
-                             y="MaxPower",
-                             x="AC or DC?",
-                             color="AC or DC?",
-                             color_discrete_sequence=['rgb(137, 138, 0)', 'rgb(0, 102, 28)'],
-                             labels={"MaxPower": "Maximaal gevraagde<br>vermogen in W",
-                                     "AC or DC?": "Predicted AC or DC"}
-                             )
-            fig_MP.update_yaxes(type="log" if st.session_state.log_scale_MP else "linear")
-            fig_MP.update_layout(yaxis=dict(range=[0,None]))
+            # Boxplot uit de vijfgetallensamenvatting, niet uit alle punten #
+            fig_MP = fc.haal(("box", versie, "MaxPower", st.session_state.log_scale_MP),
+                             lambda: lg.box_figuur(agg, "MaxPower", *lg.BOXEN["MaxPower"],
+                                                   st.session_state.log_scale_MP))
             st.plotly_chart(fig_MP, use_container_width=True)
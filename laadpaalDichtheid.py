@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+import ruimtelijkeIndex as ri
+
+# --- Laadpalen per elektrische auto, per regio en per maand ---
+# Eén keer per verversing (nieuwe cars.pkl of nieuwe laadpalen) worden de
+# laadpalen aan een provincie en een postcodegebied (PC2) gekoppeld en de
+# auto's per regio en maand geteld. Het resultaat is een kleine
+# opzoektabel; de pagina's filteren daar alleen nog in.
+#
+# De RDW-tabel heeft geen adres van de houder. Staat er een kolom uit
+# VOERTUIG_REGIO in cars.pkl, dan wordt per regio gedeeld; anders alleen
+# voor heel Nederland en blijft het aantal auto's per regio leeg (NaN).
+
+LAND = "Nederland"
+NIVEAUS = ["land", "provincie", "postcode"]
+VOERTUIG_REGIO = {"provincie": "provincie", "postcode": "postcode"}
+_PC2 = r"^\s*(\d{2})\d{2}"
+
+
+def postcodegebied(postcodes):
+    """Eerste twee cijfers van een Nederlandse postcode ('1234 AB' -> '12'), anders None."""
+    pc2 = pd.Series(postcodes, dtype="string").str.extract(_PC2, expand=False)
+    return pc2.astype(object).where(pc2.notna(), None).to_numpy()
+
+
+def _vul_aan(waarden, index):
+    # Laadpalen zonder postcode krijgen die van de dichtstbijzijnde laadpaal met postcode
+    bekend = np.array([w is not None for w in waarden], dtype=bool)
+    if bekend.all() or not bekend.any():
+        return waarden
+
+    met_postcode = ri.bouw_index(index["lat"][bekend], index["lon"][bekend])
+    namen = waarden[bekend]
+    waarden = waarden.copy()
+    for i in np.flatnonzero(~bekend):
+        positie, _ = ri.dichtstbij(met_postcode, index["lat"][i], index["lon"][i], 1)
+        waarden[i] = namen[positie[0]]
+    return waarden
+
+
+def laadpaal_regios(locaties, index):
+    """Per laadpaal: maand van aanmaken en regio per niveau."""
+    gemaakt = pd.to_datetime(locaties["DateCreated"], errors="coerce", utc=True)
+    return pd.DataFrame({
+        "maand": gemaakt.dt.tz_localize(None).dt.to_period("M"),
+        "land": LAND,
+        "provincie": locaties["Provincie"].to_numpy(dtype=object),
+        "postcode": _vul_aan(postcodegebied(locaties["AddressInfo.Postcode"]), index),
+        "lat": index["lat"],
+        "lon": index["lon"],
+    })
+
+
+def voertuig_regios(cars):
+    """Regio per auto per niveau, of None als cars.pkl die regio niet heeft."""
+    regios = {"land": pd.Series(LAND, index=cars.index, dtype="category")}
+    for niveau, kolom in VOERTUIG_REGIO.items():
+        if kolom not in cars.columns:
+            regios[niveau] = None
+        elif niveau == "provincie":
+            regios[niveau] = cars[kolom].map(ri.normaliseer_provincie).astype("category")
+        else:
+            regios[niveau] = pd.Series(postcodegebied(cars[kolom]), index=cars.index).astype("category")
+    return regios
+
+
+def _cumulatief(tellingen, maanden):
+    # (regio, maand) -> aantal, opgeteld over de maanden per regio
+    tabel = tellingen.unstack("maand", fill_value=0).reindex(columns=maanden.rename("maand"), fill_value=0)
+    return tabel.cumsum(axis=1).stack()
+
+
+def bouw_dichtheid(cars, locaties, index):
+    """Opzoektabel met laadpalen, auto's en laadpalen per 1000 auto's.
+
+    Geeft {"tijdlijn": niveau, regio, maand, ... per maand (cumulatief),
+    "regios": dezelfde kolommen voor de laatste maand plus lat/lon}.
+    """
+    laadpalen = laadpaal_regios(locaties, index)
+    auto_regios = voertuig_regios(cars)
+
+    ev_maand = cars["datum_eerste_toelating"].dt.to_period("M")
+
+    bekend = [m for m in [laadpalen["maand"].min(), laadpalen["maand"].max(), ev_maand.min(), ev_maand.max()]
+              if not pd.isna(m)]
+    if not bekend:
+        maanden = pd.period_range(pd.Timestamp.now(), periods=1, freq="M")
+    else:
+        maanden = pd.period_range(min(bekend), max(bekend), freq="M")
+    # Laadpalen zonder datum tellen vanaf de eerste maand mee
+    laadpalen["maand"] = laadpalen["maand"].fillna(maanden[0])
+
+    tijdlijnen = []
+    for niveau in NIVEAUS:
+        lp = _cumulatief(laadpalen.groupby([niveau, "maand"]).size().rename_axis(["regio", "maand"]), maanden)
+        frame = lp.rename("laadpalen").to_frame()
+
+        regio = auto_regios[niveau]
+        if regio is None:
+            frame["evs"] = np.nan
+        else:
+            ev = pd.Series(1, index=cars.index).groupby([regio, ev_maand], observed=True).size()
+            ev = _cumulatief(ev.rename_axis(["regio", "maand"]), maanden)
+            frame = frame.join(ev.rename("evs"), how="outer").fillna({"laadpalen": 0, "evs": 0})
+
+        tijdlijnen.append(frame.reset_index().assign(niveau=niveau))
+
+    tijdlijn = pd.concat(tijdlijnen, ignore_index=True)
+    tijdlijn["per_1000_ev"] = 1000 * tijdlijn["laadpalen"] / tijdlijn["evs"].where(tijdlijn["evs"] > 0)
+    tijdlijn["maand"] = tijdlijn["maand"].astype(str)
+    tijdlijn = tijdlijn[["niveau", "regio", "maand", "laadpalen", "evs", "per_1000_ev"]]
+
+    # Middelpunt per regio: vaste punten voor land en provincie, het
+    # gemiddelde van de laadpalen voor een postcodegebied
+    centra = [
+        pd.DataFrame({"niveau": "land", "regio": [LAND],
+                      "lat": [ri.PROVINCIE_LOCATIES["Alle provincies"]["center"][0]],
+                      "lon": [ri.PROVINCIE_LOCATIES["Alle provincies"]["center"][1]]}),
+        pd.DataFrame({"niveau": "provincie", "regio": ri.PROVINCIES,
+                      "lat": [ri.PROVINCIE_LOCATIES[p]["center"][0] for p in ri.PROVINCIES],
+                      "lon": [ri.PROVINCIE_LOCATIES[p]["center"][1] for p in ri.PROVINCIES]}),
+        laadpalen.groupby("postcode")[["lat", "lon"]].mean().rename_axis("regio").reset_index().assign(niveau="postcode"),
+    ]
+    laatste = tijdlijn[tijdlijn["maand"] == str(maanden[-1])]
+    regios = laatste.merge(pd.concat(centra, ignore_index=True), on=["niveau", "regio"], how="left")
+
+    return {"tijdlijn": tijdlijn.reset_index(drop=True), "regios": regios}
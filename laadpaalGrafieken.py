@@ -0,0 +1,312 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+import laadpaalBezetting as lb
+import laadpaalStream as ls
+import trendlijn as tl
+
+# --- Grafieken uit de aggregaten van laadpaalStream ---
+# Alles wat hier naar de browser gaat is begrensd door het aantal bakken,
+# niet door het aantal sessies.
+
+HIST_KLEUREN = ['rgb(99, 110, 250)', 'rgb(239, 85, 59)', 'rgb(0, 204, 150)', 'rgb(171, 99, 250)']
+TIJD_KLEUREN = ['rgb(186, 31, 28)', 'rgb(50, 168, 82)', 'rgb(173, 102, 43)', 'rgb(191, 179, 48)']
+ENERGIE_KLEUREN = ['rgb(188, 189, 34)', 'rgb(50, 168, 82)']
+DAG_KLEUREN = ['rgb(102, 40, 166)', 'rgb(235, 52, 201)']
+
+# Boxplots op de energie-tab: kolom, kleuren per AC/DC, y-label
+BOXEN = {
+    "TotalEnergy": (['rgb(193, 194, 70)', 'rgb(90, 176, 113)'], "Totaal verbruikte<br>energie in Wh"),
+    "ChargeTime": (['rgb(180, 181, 0)', 'rgb(0, 171, 46)'], "Tijd aan het opladen"),
+    "MaxPower": (['rgb(137, 138, 0)', 'rgb(0, 102, 28)'], "Maximaal gevraagde<br>vermogen in W"),
+}
+
+# Tot MAX_PUNTEN gaan ruwe punten mee (WebGL), daarboven wordt uitgedund per
+# rastercel; boven DICHTHEID_GRENS alleen nog de gebinde dichtheid
+MAX_PUNTEN = 20_000
+DICHTHEID_GRENS = 2_000_000
+DUN_RASTER = 200
+
+
+def _midden(bakken):
+    return (bakken[:-1] + bakken[1:]) / 2
+
+
+def _dichtheid_trace(tellingen, x_bakken, y_bakken, naam, kleur, opacity):
+    # Alleen gevulde bakken; markergrootte groeit met log(aantal)
+    i, j = np.nonzero(tellingen)
+    aantal = tellingen[i, j]
+    return go.Scattergl(
+        x=_midden(x_bakken)[i],
+        y=_midden(y_bakken)[j],
+        mode="markers",
+        name=naam,
+        marker=dict(color=kleur, opacity=opacity, size=4 + 3 * np.log10(aantal)),
+        text=aantal,
+        hovertemplate="%{x}, %{y}<br>Aantal: %{text}",
+    )
+
+
+def dun_uit(x, y, max_punten=MAX_PUNTEN, raster=DUN_RASTER):
+    """Indices van hooguit max_punten punten, dichtheidsbewust uitgedund.
+
+    Per cel van een raster x raster grid blijven maximaal `plafond` punten
+    over; het plafond wordt zo hoog mogelijk gekozen binnen max_punten. Lege
+    en dunne gebieden (uitschieters) blijven dus volledig zichtbaar, alleen
+    de drukke cellen worden uitgedund.
+    """
+    n = len(x)
+    if n <= max_punten:
+        return np.arange(n)
+
+    def _cel(v):
+        lo, hi = np.nanmin(v), np.nanmax(v)
+        schaal = raster / (hi - lo) if hi > lo else 0
+        return np.clip(((v - lo) * schaal).astype(np.int64), 0, raster - 1)
+
+    cel = _cel(x) * raster + _cel(y)
+
+    # Willekeurige maar vaste volgorde binnen elke cel
+    volgorde = np.lexsort((np.random.default_rng(42).random(n), cel))
+    gesorteerd = cel[volgorde]
+    eerste = np.r_[0, np.flatnonzero(np.diff(gesorteerd)) + 1]
+    rang = np.arange(n) - np.repeat(eerste, np.diff(np.r_[eerste, n]))
+
+    # Grootste plafond waarbij het totaal nog past
+    per_cel = np.diff(np.r_[eerste, n])
+    lo, hi = 1, int(per_cel.max())
+    while lo < hi:
+        midden = (lo + hi + 1) // 2
+        if np.minimum(per_cel, midden).sum() <= max_punten:
+            lo = midden
+        else:
+            hi = midden - 1
+
+    return np.sort(volgorde[rang < lo])
+
+
+def _punten_trace(x, y, naam, kleur, opacity):
+    return go.Scattergl(x=x, y=y, mode="markers", name=naam,
+                        marker=dict(color=kleur, opacity=opacity))
+
+
+def tijd_histogram(agg, log_schaal):
+    """ConnectedTime/ChargeTime histogram per AC/DC uit vaste bakken."""
+    fig = go.Figure()
+    midden = _midden(ls.TIJD_BAKKEN)
+    breedte = ls.TIJD_BAKKEN[1] - ls.TIJD_BAKKEN[0]
+
+    for kleur, (kolom, laadtype) in zip(HIST_KLEUREN, agg["histogram"]):
+        tellingen = agg["histogram"][(kolom, laadtype)]
+        gevuld = tellingen > 0
+        fig.add_trace(go.Bar(x=midden[gevuld],
+                             y=tellingen[gevuld],
+                             width=breedte,
+                             name=f"{kolom}_{laadtype}",
+                             marker_color=kleur,
+                             opacity=0.65))
+
+    fig.update_layout(barmode="overlay",
+                      legend_title="Legenda",
+                      xaxis_title="Tijd in uur",
+                      yaxis_title="count")
+    fig.update_yaxes(type="log" if log_schaal else "linear")
+    return fig
+
+
+def tijd_dichtheid(agg):
+    """ConnectedTime x ChargeTime als gebinde dichtheid per laadsoort."""
+    fig = go.Figure()
+    for kleur, soort in zip(TIJD_KLEUREN, ls.LAADSOORTEN):
+        fig.add_trace(_dichtheid_trace(agg["tijd_2d"][soort], ls.TIJD_2D_BAKKEN, ls.TIJD_2D_BAKKEN,
+                                       soort, kleur, 0.65))
+    fig.update_layout(xaxis_title="Tijd aan het opladen",
+                      yaxis_title="Tijd verbonden",
+                      legend_title="charge_type")
+    return fig
+
+
+def tijd_scatter(laaddata, agg):
+    """ConnectedTime x ChargeTime: ruwe (uitgedunde) punten of dichtheid."""
+    if laaddata is None or len(laaddata) > DICHTHEID_GRENS:
+        return tijd_dichtheid(agg)
+
+    soort = (laaddata["FullyCharged?"].astype(str) + " - " + laaddata["AC or DC?"].astype(str)).to_numpy()
+    laadtijd = laaddata["ChargeTime"].to_numpy()
+    verbonden = laaddata["ConnectedTime"].to_numpy()
+    keep = dun_uit(laadtijd, verbonden)
+
+    fig = go.Figure()
+    for kleur, s in zip(TIJD_KLEUREN, ls.LAADSOORTEN):
+        sel = keep[soort[keep] == s]
+        fig.add_trace(_punten_trace(laadtijd[sel], verbonden[sel], s, kleur, 0.65))
+    fig.update_layout(xaxis_title="Tijd aan het opladen",
+                      yaxis_title="Tijd verbonden",
+                      legend_title="charge_type")
+    return fig
+
+
+def energie_scatter(laaddata, agg, trendlijn):
+    """TotalEnergy x ChargeTime: ruwe (uitgedunde) punten of dichtheid.
+
+    De trendlijn komt altijd uit de sommen over alle sessies, niet uit de
+    uitgedunde punten.
+    """
+    if laaddata is None or len(laaddata) > DICHTHEID_GRENS:
+        return energie_figuur(agg, trendlijn)
+
+    soort = laaddata["AC or DC?"].to_numpy()
+    laadtijd = laaddata["ChargeTime"].to_numpy()
+    energie = laaddata["TotalEnergy"].to_numpy()
+    keep = dun_uit(laadtijd, energie)
+
+    fig = go.Figure()
+    for kleur, laadtype in zip(ENERGIE_KLEUREN, lb.LAADTYPES):
+        sel = keep[soort[keep] == laadtype]
+        fig.add_trace(_punten_trace(laadtijd[sel], energie[sel], laadtype, kleur, 0.75))
+    _trendlijnen(fig, agg, trendlijn, laadtijd.min(), laadtijd.max())
+
+    fig.update_layout(xaxis_title="Tijd aan het opladen",
+                      yaxis_title="Totaal verbruikte<br>energie in Wh",
+                      legend_title="Predicted AC or DC")
+    fig.update_yaxes(range=[0, 87500])
+    return fig
+
+
+def _trendlijnen(fig, agg, trendlijn, x_min, x_max):
+    if not trendlijn:
+        return
+    x = np.array([x_min, x_max], dtype="float64")
+    for kleur, laadtype in zip(ENERGIE_KLEUREN, lb.LAADTYPES):
+        fit = tl.fit(agg["energie_stats"][laadtype])
+        if fit is None:
+            continue
+        helling, snijpunt, r2 = fit
+        fig.add_trace(go.Scatter(x=x, y=helling * x + snijpunt, mode="lines",
+                                 line=dict(color=kleur), showlegend=False,
+                                 hovertemplate=(f"<b>OLS trendline</b><br>TotalEnergy = {helling:g} * ChargeTime + {snijpunt:g}"
+                                                f"<br>R<sup>2</sup>={r2:.6f}<extra>{laadtype}</extra>")))
+
+
+def energie_figuur(agg, trendlijn):
+    """TotalEnergy x ChargeTime als gebinde dichtheid, met OLS uit de sommen."""
+    fig = go.Figure()
+    for kleur, laadtype in zip(ENERGIE_KLEUREN, lb.LAADTYPES):
+        fig.add_trace(_dichtheid_trace(agg["energie_2d"][laadtype], ls.LAADTIJD_BAKKEN, ls.ENERGIE_BAKKEN,
+                                       laadtype, kleur, 0.75))
+    _trendlijnen(fig, agg, trendlijn, ls.LAADTIJD_BAKKEN[0], ls.LAADTIJD_BAKKEN[-1])
+
+    fig.update_layout(xaxis_title="Tijd aan het opladen",
+                      yaxis_title="Totaal verbruikte<br>energie in Wh",
+                      legend_title="Predicted AC or DC")
+    fig.update_yaxes(range=[0, 87500])
+    return fig
+
+
+def box_figuur(agg, kolom, kleuren, label, log_schaal):
+    """Boxplot per AC/DC uit de vijfgetallensamenvatting van de schets."""
+    fig = go.Figure()
+    for kleur, laadtype in zip(kleuren, lb.LAADTYPES):
+        box = ls.vijfgetallen(agg, kolom, laadtype)
+        fig.add_trace(go.Box(x=[laadtype],
+                             q1=[box["q1"]],
+                             median=[box["mediaan"]],
+                             q3=[box["q3"]],
+                             lowerfence=[box["onder"]],
+                             upperfence=[box["boven"]],
+                             name=laadtype,
+                             marker_color=kleur))
+
+    fig.update_layout(xaxis_title="Predicted AC or DC",
+                      yaxis_title=label,
+                      legend_title="Predicted AC or DC")
+    fig.update_yaxes(type="log" if log_schaal else "linear")
+    fig.update_layout(yaxis=dict(range=[0, None]))
+    return fig
+
+
+def _band_sporen(fig, band):
+    # Per laadtype de voorspelde band (onder..boven) en een gestippelde lijn,
+    # als trap per uur; band komt uit laadpaalVoorspelling.segment()
+    for kleur, (laadtype, deel) in zip(DAG_KLEUREN, band.groupby("AC or DC?", sort=False)):
+        doorzichtig = kleur.replace("rgb", "rgba").replace(")", ", 0.2)")
+        fig.add_trace(go.Scatter(x=deel["Uur"], y=deel["boven"], mode="lines", line=dict(width=0, shape="hv"),
+                                 showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=deel["Uur"], y=deel["onder"], mode="lines", line=dict(width=0, shape="hv"),
+                                 fill="tonexty", fillcolor=doorzichtig, name=f"{laadtype} voorspelling (p10-p90)"))
+        fig.add_trace(go.Scatter(x=deel["Uur"], y=deel["voorspelling"], mode="lines",
+                                 line=dict(color=kleur, dash="dot", shape="hv"), name=f"{laadtype} voorspelling"))
+    return fig
+
+
+def dag_figuur(laadpaal_dag, dag, band=None):
+    """Aantal aangesloten auto's per minuut op één dag (uit dag_uit_index).
+
+    Met band (voorspelde aangesloten auto's per uur) wordt die eroverheen gelegd.
+    """
+    fig = px.line(laadpaal_dag,
+                  x='Minuut',
+                  y='Aantal_autos',
+                  color="AC or DC?",
+                  color_discrete_sequence=DAG_KLEUREN,
+                  title=f'Aantal aangesloten auto’s op {dag}',
+                  labels={"Minuut": "Tijd",
+                          "Aantal_autos": "Aantal Aangesloten Autos"})
+    if band is not None and len(band):
+        _band_sporen(fig, band)
+    fig.update_layout(yaxis_range=[0, 20])
+    return fig
+
+
+def voorspelling_figuur(band, titel, label):
+    """Voorspelling met band per uur over de hele horizon, per laadtype."""
+    fig = _band_sporen(go.Figure(), band)
+    fig.update_layout(title=titel, xaxis_title="Tijd", yaxis_title=label, template="plotly_white")
+    return fig
+
+
+def week_figuur(week):
+    return px.imshow(week,
+                     aspect="auto",
+                     color_continuous_scale="Purples",
+                     title="Gemiddeld aantal aangesloten auto's per weekdag en uur",
+                     labels={"x": "Uur", "y": "Weekdag", "color": "Aantal autos"})
+
+
+def maand_figuur(maand, naam):
+    return px.imshow(maand,
+                     aspect="auto",
+                     color_continuous_scale="Purples",
+                     title=f"Gemiddeld aantal aangesloten auto's per dag en uur in {naam}",
+                     labels={"x": "Uur", "y": "Dag", "color": "Aantal autos"})
+
+
+# --- Benutting en piekbelasting (laadpaalAnalyse) ---
+
+def uur_van_week_figuur(tabel, titel, label):
+    return px.imshow(tabel,
+                     aspect="auto",
+                     color_continuous_scale="Purples",
+                     title=titel,
+                     labels={"x": "Uur", "y": "Weekdag", "color": label})
+
+
+def piek_figuur(piek):
+    """Hoogste gelijktijdig gevraagde vermogen per dag."""
+    fig = px.line(piek.rename_axis("Dag").reset_index(),
+                  x="Dag",
+                  y=piek.name,
+                  color_discrete_sequence=DAG_KLEUREN,
+                  title="Piekvermogen per dag (som van MaxPower van ladende auto's)")
+    return fig
+
+
+def overzicht_figuur(tabel, kolommen, titel, y_label):
+    """Lijnen per maand uit laadpaalAnalyse.maand_overzicht."""
+    fig = go.Figure()
+    for kleur, kolom in zip(HIST_KLEUREN, kolommen):
+        fig.add_trace(go.Scatter(x=tabel.index, y=tabel[kolom], mode="lines+markers",
+                                 name=kolom, line=dict(color=kleur)))
+    fig.update_layout(title=titel, xaxis_title="Maand", yaxis_title=y_label)
+    return fig
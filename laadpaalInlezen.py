@@ -0,0 +1,145 @@
+import glob
+import hashlib
+import os
+import pickle
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# --- Schema van laadpaaldata.csv ---
+# Compacte types: float32 voor de meetwaarden, categorie voor AC/DC
+KOLOM_TYPES = {
+    "TotalEnergy": "float32",
+    "ConnectedTime": "float32",
+    "ChargeTime": "float32",
+    "MaxPower": "float32",
+}
+DATUM_FORMAAT = '%Y-%m-%d %H:%M:%S'
+
+
+def schoon_sessies(laaddata):
+    """Zelfde opschoning en afleiding als laadpaal() altijd deed.
+
+    Werkt op een los blok rijen, dus ook bruikbaar per chunk.
+    """
+    ## DATUMS OMZETTEN NAAR DATETIME ##
+    laaddata["Started"] = pd.to_datetime(laaddata["Started"], format=DATUM_FORMAAT, errors='coerce')
+    laaddata["Ended"] = pd.to_datetime(laaddata["Ended"], format=DATUM_FORMAAT, errors='coerce')
+    laaddata = laaddata.dropna(subset=["Started", "Ended"])
+
+    # Gooi alles onder 0 chargetime weg want dat klopt niet #
+    laaddata = laaddata[laaddata["ChargeTime"] >= 0].copy()
+
+    # Afleidingen op float64 zodat de indeling niet verschuift door de float32 kolommen #
+    energie = laaddata["TotalEnergy"].astype("float64")
+    laadtijd = laaddata["ChargeTime"].astype("float64")
+
+    # Volledig opgeladen binnen de sessie? #
+    laaddata["FullyCharged?"] = laadtijd != laaddata["ConnectedTime"].astype("float64")
+
+    laaddata["AC or DC?"] = pd.Categorical(
+        np.where((energie / 1000) / laadtijd < 4, "AC", "DC"),
+        categories=["AC", "DC"],
+    )
+
+    return laaddata.astype(KOLOM_TYPES)
+
+
+def lees_csv(pad, **kwargs):
+    return pd.read_csv(pad, dtype={k: "float64" for k in KOLOM_TYPES}, **kwargs)
+
+
+def cache_sleutel(pad):
+    # Grootte + mtime van de bron; verandert de CSV dan hoort er een nieuwe cache bij
+    info = os.stat(pad)
+    return f"{info.st_size}-{info.st_mtime_ns}"
+
+
+def rij_hashes(laaddata):
+    """Hash per opgeschoonde sessie (inhoud + indexlabel), voor vingerafdruk()."""
+    return pd.util.hash_pandas_object(laaddata, index=True)
+
+
+def vingerafdruk(hashes, laatste_rij):
+    """Vingerafdruk van de sessies met indexlabel <= laatste_rij.
+
+    Incrementele caches tellen alleen rijen na laatste_rij erbij. Is de CSV
+    herschreven (een verbeterde rij, een nieuwe export, andere volgorde),
+    dan klopt de vingerafdruk van het al getelde deel niet meer en moet de
+    cache opnieuw opgebouwd worden.
+    """
+    deel = hashes[hashes.index <= laatste_rij].to_numpy()
+    return hashlib.sha1(deel.tobytes()).hexdigest()
+
+
+# Wat een half geschreven of kapot cachebestand bij het inlezen kan geven;
+# de cache wordt dan gewoon opnieuw opgebouwd
+LEESFOUTEN = (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile, pickle.UnpicklingError)
+
+
+def bewaar_npz(pad, data):
+    """np.savez via een tijdelijk bestand en os.replace, zoals de andere caches."""
+    tijdelijk = pad + ".tmp"
+    with open(tijdelijk, "wb") as f:
+        np.savez(f, **data)
+    os.replace(tijdelijk, pad)
+
+
+def laad_incrementeel(laaddata, lees, bouw, bewaar, hashes=None):
+    """Gedeelde aanpak van de optelbare caches (index, aggregaten, analyse).
+
+    lees() geeft de cache van schijf, bouw(laaddata, cache) telt de rijen na
+    cache["laatste_rij"] erbij (of alles als cache None is) en bewaar(cache)
+    schrijft hem weg. Is de cache onleesbaar, de CSV kleiner geworden of de
+    vingerafdruk van de al getelde rijen veranderd, dan wordt opnieuw
+    begonnen. hashes is rij_hashes(laaddata), als die al berekend is.
+    """
+    try:
+        cache = lees()
+    except LEESFOUTEN:
+        cache = None
+
+    hashes = rij_hashes(laaddata) if hashes is None else hashes
+    if cache is not None and not laaddata.empty and (
+            cache["laatste_rij"] > laaddata.index.max()
+            or cache.get("vingerafdruk") != vingerafdruk(hashes, cache["laatste_rij"])):
+        cache = None
+
+    vorige = None if cache is None else cache["laatste_rij"]
+    cache = bouw(laaddata, cache)
+    cache["vingerafdruk"] = vingerafdruk(hashes, cache["laatste_rij"])
+
+    if cache["laatste_rij"] != vorige:
+        bewaar(cache)
+    return cache
+
+
+def cache_pad(pad, sleutel, extensie=".parquet"):
+    map_, naam = os.path.split(pad)
+    basis = os.path.splitext(naam)[0]
+    return os.path.join(map_, f".{basis}-{sleutel}{extensie}")
+
+
+def laad_sessies(pad="laadpaaldata.csv"):
+    """Opgeschoonde sessies uit de Parquet-cache, of uit de CSV als die nieuwer is.
+
+    Het geretourneerde frame wordt gedeeld tussen reruns en gebruikers,
+    dus niet aanpassen maar .assign() / .copy() gebruiken.
+    """
+    sleutel = cache_sleutel(pad)
+    cache = cache_pad(pad, sleutel)
+
+    if os.path.exists(cache):
+        return pd.read_parquet(cache)
+
+    laaddata = schoon_sessies(lees_csv(pad))
+
+    # Oude caches van dezelfde CSV opruimen
+    for oud in glob.glob(cache_pad(pad, "*")):
+        os.remove(oud)
+    tijdelijk = cache + ".tmp"
+    laaddata.to_parquet(tijdelijk)
+    os.replace(tijdelijk, cache)
+
+    return laaddata
@@ -0,0 +1,58 @@
+import folium
+import numpy as np
+from folium.plugins import FastMarkerCluster
+
+import autoGrafieken as ag
+import ruimtelijkeIndex as ri
+
+# --- Folium-kaarten voor de laadpalen ---
+# Losse bouwers zonder Streamlit, zodat rapport en benchmarks ze ook kunnen
+# gebruiken; GeodataEnCars zet ze per versie in st.cache_resource.
+
+# Markers en popups worden pas in de browser gemaakt, per rij [lat, lon, adres, vermogen]
+MARKER_CALLBACK = """
+function (rij) {
+    var marker = L.circleMarker(new L.LatLng(rij[0], rij[1]),
+                                {radius: 3, color: "blue", fill: true, fillOpacity: 0.7});
+    marker.bindPopup(function () { return rij[2] + "<br>Vermogen: " + rij[3] + " kW"; });
+    return marker;
+};
+"""
+
+
+def laadpalen_kaart(provincie, Laadpaal_locatie):
+    """Alle laadpalen (van één provincie) als FastMarkerCluster."""
+    loc = ri.PROVINCIE_LOCATIES.get(provincie, ri.PROVINCIE_LOCATIES["Alle provincies"])
+    m = folium.Map(location=loc["center"], zoom_start=loc["zoom"], tiles="CartoDB positron")
+
+    if provincie != "Alle provincies":
+        Laadpaal_locatie = Laadpaal_locatie[Laadpaal_locatie["Provincie"] == provincie]
+
+    # Alle laadpalen in één keer uit de kolommen, zonder iterrows
+    rijen = list(map(list, zip(
+        Laadpaal_locatie["AddressInfo.Latitude"].to_numpy(dtype="float64").tolist(),
+        Laadpaal_locatie["AddressInfo.Longitude"].to_numpy(dtype="float64").tolist(),
+        Laadpaal_locatie["AddressInfo.AddressLine1"].fillna("").astype(str).tolist(),
+        Laadpaal_locatie["PowerKW"].astype(str).tolist(),
+    )))
+
+    FastMarkerCluster(rijen, callback=MARKER_CALLBACK).add_to(m)
+    return m
+
+
+def dichtheid_kaart(grootheid, regios):
+    """Kaartlaag met één cirkel per regio, oppervlak naar rato van de grootheid."""
+    loc = ri.PROVINCIE_LOCATIES["Alle provincies"]
+    m = folium.Map(location=loc["center"], zoom_start=loc["zoom"], tiles="CartoDB positron")
+
+    regios = regios.dropna(subset=["lat", "lon", grootheid])
+    grootste = max(regios[grootheid].max(), 1e-9) if len(regios) else 1.0
+    for regio in regios.itertuples(index=False):  # hoogstens ~100 regio's
+        waarde = getattr(regio, grootheid)
+        folium.CircleMarker(
+            location=[regio.lat, regio.lon],
+            radius=float(5 + 25 * np.sqrt(waarde / grootste)),
+            color="green", fill=True, fill_opacity=0.5,
+            tooltip=f"{regio.regio}: {waarde:,.1f} ({ag.DICHTHEID_LABELS[grootheid].lower()})",
+        ).add_to(m)
+    return m
@@ -0,0 +1,272 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import laadpaalAnalyse as la
+import laadpaalBezetting as lb
+import laadpaalInlezen as li
+import profiel
+import trendlijn as tl
+
+# --- Streaming aggregatie van laadsessies ---
+# De CSV wordt in blokken gelezen; per blok dezelfde opschoning als
+# laad_sessies() en daarna alleen optelbare aggregaten bijhouden. Twee
+# aggregaten samenvoegen is dus gewoon optellen, de ruwe tabel staat nooit
+# in zijn geheel in het geheugen.
+
+CHUNK_RIJEN = 1_000_000
+
+# Boven deze grootte wordt de CSV gestreamd naar aggregaten in plaats van ingeladen
+GROOT_BESTAND = 500 * 1024**2
+
+# Vaste bakken voor de tijd-histogrammen (uren)
+TIJD_BAKKEN = np.arange(0, 200.5, 0.5)
+TIJD_KOLOMMEN = ["ConnectedTime", "ChargeTime"]
+
+# Log-bakken voor de kwantielschets: relatieve fout ~1% tussen 1e-3 en 1e6
+SCHETS_GAMMA = 1.02
+SCHETS_MIN = 1e-3
+SCHETS_BAKKEN = int(np.ceil(np.log(1e6 / SCHETS_MIN) / np.log(SCHETS_GAMMA))) + 1
+BOX_KOLOMMEN = ["ChargeTime", "TotalEnergy", "MaxPower"]
+
+# 2D-bakken voor TotalEnergy x ChargeTime
+ENERGIE_BAKKEN = np.linspace(0, 87500, 176)
+LAADTIJD_BAKKEN = np.linspace(0, 55, 111)
+
+# 2D-bakken voor ConnectedTime x ChargeTime per "FullyCharged? - AC or DC?"
+TIJD_2D_BAKKEN = np.arange(0, 201, 1.0)
+LAADSOORTEN = [f"{v} - {t}" for v in [False, True] for t in lb.LAADTYPES]
+
+
+def lege_aggregaten():
+    types = lb.LAADTYPES
+    return {
+        "n": 0,
+        "laatste_rij": -1,
+        "begin": pd.NaT,
+        "einde": pd.NaT,
+        # Laatste Started, voor het bereik van de voorspelling (einde is de laatste Ended)
+        "laatste_start": pd.NaT,
+        "histogram": {(k, t): np.zeros(len(TIJD_BAKKEN) - 1, dtype=np.int64) for k in TIJD_KOLOMMEN for t in types},
+        "schets": {(k, t): np.zeros(SCHETS_BAKKEN + 1, dtype=np.int64) for k in BOX_KOLOMMEN for t in types},
+        "minimum": {(k, t): np.inf for k in BOX_KOLOMMEN for t in types},
+        "maximum": {(k, t): -np.inf for k in BOX_KOLOMMEN for t in types},
+        # n, Σx, Σy, Σxy, Σx², Σy² met x = ChargeTime en y = TotalEnergy
+        "energie_stats": {t: np.zeros(6) for t in types},
+        "energie_2d": {t: np.zeros((len(LAADTIJD_BAKKEN) - 1, len(ENERGIE_BAKKEN) - 1), dtype=np.int64) for t in types},
+        "tijd_2d": {s: np.zeros((len(TIJD_2D_BAKKEN) - 1, len(TIJD_2D_BAKKEN) - 1), dtype=np.int64) for s in LAADSOORTEN},
+        "bezetting": None,
+        "analyse": None,
+    }
+
+
+def _schets_bak(waarden):
+    # Bak 0 is voor nul (en alles onder SCHETS_MIN), daarna log-bakken
+    waarden = np.asarray(waarden, dtype="float64")
+    bak = np.zeros(len(waarden), dtype=np.int64)
+    positief = waarden >= SCHETS_MIN
+    bak[positief] = np.minimum(
+        np.ceil(np.log(waarden[positief] / SCHETS_MIN) / np.log(SCHETS_GAMMA)).astype(np.int64) + 1,
+        SCHETS_BAKKEN,
+    )
+    return bak
+
+
+def _schets_waarde(bak):
+    if bak == 0:
+        return 0.0
+    # Midden van de log-bak
+    return SCHETS_MIN * SCHETS_GAMMA ** (bak - 1.5)
+
+
+@profiel.gemeten("ls.aggregeer")
+def aggregeer(laaddata, agg=None, bezetting=True):
+    """Tel een blok opgeschoonde sessies op bij de aggregaten.
+
+    Met bezetting=False worden de bezettingsindex en de benuttingsanalyse
+    overgeslagen, voor als die al apart via laadpaalBezetting.laad_index en
+    laadpaalAnalyse.laad_analyse bijgehouden worden.
+    """
+    if agg is None:
+        agg = lege_aggregaten()
+    if laaddata.empty:
+        return agg
+
+    agg["n"] += len(laaddata)
+    agg["laatste_rij"] = max(agg["laatste_rij"], int(laaddata.index.max()))
+    agg["begin"] = min(x for x in [agg["begin"], laaddata["Started"].min()] if pd.notna(x))
+    agg["einde"] = max(x for x in [agg["einde"], laaddata["Ended"].max()] if pd.notna(x))
+    agg["laatste_start"] = max(x for x in [agg["laatste_start"], laaddata["Started"].max()] if pd.notna(x))
+
+    soort = laaddata["AC or DC?"].to_numpy()
+    for t in lb.LAADTYPES:
+        sel = soort == t
+        if not sel.any():
+            continue
+        deel = laaddata[sel]
+
+        for k in TIJD_KOLOMMEN:
+            waarden = np.clip(deel[k].to_numpy(dtype="float64"), TIJD_BAKKEN[0], TIJD_BAKKEN[-1])
+            agg["histogram"][(k, t)] += np.histogram(waarden, bins=TIJD_BAKKEN)[0]
+
+        for k in BOX_KOLOMMEN:
+            waarden = deel[k].to_numpy(dtype="float64")
+            agg["schets"][(k, t)] += np.bincount(_schets_bak(waarden), minlength=SCHETS_BAKKEN + 1)
+            agg["minimum"][(k, t)] = min(agg["minimum"][(k, t)], waarden.min())
+            agg["maximum"][(k, t)] = max(agg["maximum"][(k, t)], waarden.max())
+
+        x = deel["ChargeTime"].to_numpy(dtype="float64")
+        y = deel["TotalEnergy"].to_numpy(dtype="float64")
+        agg["energie_stats"][t] += tl.sommen(x, y)
+        agg["energie_2d"][t] += np.histogram2d(
+            np.clip(x, LAADTIJD_BAKKEN[0], LAADTIJD_BAKKEN[-1]),
+            np.clip(y, ENERGIE_BAKKEN[0], ENERGIE_BAKKEN[-1]),
+            bins=[LAADTIJD_BAKKEN, ENERGIE_BAKKEN],
+        )[0].astype(np.int64)
+
+    volledig = laaddata["FullyCharged?"].to_numpy().astype(str)
+    laadtijd = np.clip(laaddata["ChargeTime"].to_numpy(dtype="float64"), TIJD_2D_BAKKEN[0], TIJD_2D_BAKKEN[-1])
+    verbonden = np.clip(laaddata["ConnectedTime"].to_numpy(dtype="float64"), TIJD_2D_BAKKEN[0], TIJD_2D_BAKKEN[-1])
+    for s in LAADSOORTEN:
+        v, t = s.split(" - ")
+        sel = (volledig == v) & (soort == t)
+        if sel.any():
+            agg["tijd_2d"][s] += np.histogram2d(
+                laadtijd[sel], verbonden[sel], bins=[TIJD_2D_BAKKEN, TIJD_2D_BAKKEN]
+            )[0].astype(np.int64)
+
+    if bezetting:
+        agg["bezetting"] = lb.bouw_index(laaddata, agg["bezetting"])
+        agg["analyse"] = la.bouw_analyse(laaddata, agg["analyse"])
+    return agg
+
+
+def stream_aggregaten(pad="laadpaaldata.csv", chunk_rijen=CHUNK_RIJEN):
+    """Lees de CSV in blokken en geef alleen de aggregaten terug."""
+    agg = lege_aggregaten()
+    for blok in li.lees_csv(pad, chunksize=chunk_rijen):
+        agg = aggregeer(li.schoon_sessies(blok), agg)
+    return agg
+
+
+def aggregaten_pad(csv_pad):
+    # laadpaaldata.csv -> laadpaaldata_aggregaten.pkl
+    basis = csv_pad[:-4] if csv_pad.endswith(".csv") else csv_pad
+    return basis + "_aggregaten.pkl"
+
+
+def laad_aggregaten(laaddata, pad, hashes=None):
+    """Aggregaten van schijf, bijgewerkt met alleen de nieuwe sessies.
+
+    Via li.laad_incrementeel, net als de bezettingsindex: alles is
+    optelbaar, dus rijen met een hoger indexlabel dan agg["laatste_rij"]
+    worden erbij geteld, zolang de vingerafdruk van de al getelde rijen
+    klopt. De bezettingsindex zelf wordt hier niet meegenomen.
+    """
+    def bouw(laaddata, agg):
+        nieuw = laaddata if agg is None else laaddata[laaddata.index > agg["laatste_rij"]]
+        return aggregeer(nieuw, agg, bezetting=False)
+
+    def lees():
+        agg = pd.read_pickle(pad)
+        # Aggregaten van vóór laatste_start: KeyError, dus opnieuw opbouwen
+        agg["laatste_start"]
+        return agg
+
+    def bewaar(agg):
+        tijdelijk = pad + ".tmp"
+        pd.to_pickle(agg, tijdelijk)
+        os.replace(tijdelijk, pad)
+
+    return li.laad_incrementeel(laaddata, lees, bouw, bewaar, hashes)
+
+
+def aggregaten_met_boxen(laaddata, csv_pad, hashes=None):
+    """laad_aggregaten() voor de ingeladen sessies, plus exacte kwartielen voor de boxplots."""
+    agg = dict(laad_aggregaten(laaddata, aggregaten_pad(csv_pad), hashes))
+    agg["boxen"] = exacte_boxen(laaddata)
+    return agg
+
+
+def laadpaal_data(pad="laadpaaldata.csv"):
+    """Alles wat laadpaal() nodig heeft voor één versie van de CSV.
+
+    Grote exports worden gestreamd (laaddata is dan None), anders worden de
+    sessies ingeladen en de caches op schijf bijgewerkt.
+    """
+    if os.path.getsize(pad) > GROOT_BESTAND:
+        agg = stream_aggregaten(pad)
+        return {
+            "laaddata": None,
+            "agg": agg,
+            "index": agg["bezetting"],
+            "analyse": agg["analyse"],
+            "eerste": agg["begin"],
+            "laatste": agg["laatste_start"],
+        }
+
+    laaddata = li.laad_sessies(pad)
+    # Eén keer hashen voor de vingerafdrukken van alle drie de caches
+    hashes = li.rij_hashes(laaddata)
+    return {
+        "laaddata": laaddata,
+        "agg": aggregaten_met_boxen(laaddata, pad, hashes),
+        "index": lb.laad_index(laaddata, lb.index_pad(pad), hashes),
+        "analyse": la.laad_analyse(laaddata, la.analyse_pad(pad), hashes),
+        "eerste": laaddata["Started"].min(),
+        "laatste": laaddata["Started"].max(),
+    }
+
+
+def kwantielen(agg, kolom, laadtype, qs=(0.25, 0.5, 0.75)):
+    """Benaderde kwantielen uit de schets (relatieve fout ~1%)."""
+    tellingen = agg["schets"][(kolom, laadtype)]
+    totaal = tellingen.sum()
+    if totaal == 0:
+        return [np.nan] * len(qs)
+
+    cum = np.cumsum(tellingen)
+    uitkomst = []
+    for q in qs:
+        bak = int(np.searchsorted(cum, q * (totaal - 1) + 1))
+        waarde = _schets_waarde(bak)
+        # Nooit buiten het echte bereik
+        uitkomst.append(float(np.clip(waarde, agg["minimum"][(kolom, laadtype)], agg["maximum"][(kolom, laadtype)])))
+    return uitkomst
+
+
+def exacte_boxen(laaddata):
+    """Exacte kwartielen per kolom en AC/DC, voor als de ruwe sessies er wel zijn."""
+    kwartielen = (
+        laaddata.groupby("AC or DC?", observed=True)[BOX_KOLOMMEN]
+        .quantile([0.25, 0.5, 0.75])
+    )
+    return {
+        (k, t): kwartielen.loc[t, k].tolist()
+        for t in kwartielen.index.get_level_values(0).unique()
+        for k in BOX_KOLOMMEN
+    }
+
+
+def vijfgetallen(agg, kolom, laadtype):
+    """Vijfgetallensamenvatting voor een boxplot: fences op 1.5 x IQR.
+
+    Gebruikt exacte kwartielen als die in agg["boxen"] staan, anders de schets.
+    """
+    if (kolom, laadtype) in agg.get("boxen", {}):
+        q1, mediaan, q3 = agg["boxen"][(kolom, laadtype)]
+    else:
+        q1, mediaan, q3 = kwantielen(agg, kolom, laadtype)
+    iqr = q3 - q1
+    laag = agg["minimum"][(kolom, laadtype)]
+    hoog = agg["maximum"][(kolom, laadtype)]
+    return {
+        "q1": q1,
+        "mediaan": mediaan,
+        "q3": q3,
+        "onder": max(laag, q1 - 1.5 * iqr),
+        "boven": min(hoog, q3 + 1.5 * iqr),
+        "min": laag,
+        "max": hoog,
+    }
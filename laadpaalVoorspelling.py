@@ -0,0 +1,216 @@
+import glob
+import os
+import numpy as np
+import pandas as pd
+
+import laadpaalBezetting as lb
+import laadpaalInlezen as li
+
+# --- Voorspelling van bezetting en energievraag ---
+# Per segment (bron x AC/DC x grootheid) een gewogen ridge-fit op het
+# uurraster met seizoensfeatures: uur van de week (168 dummies), een
+# lineaire trend en jaarlijkse Fourier-termen. Recente weken wegen zwaarder.
+# De band komt uit de kwantielen van de residuen per uur van de dag over de
+# laatste weken. Alles is matrixrekenwerk op hoogstens enkele tienduizenden
+# uren, dus snel genoeg om bij elke verversing opnieuw te trainen. De
+# segmenten gaan na elkaar: een procespool vanuit de verversthread kost
+# meer (fork van een proces met threads) dan de paar honderd ms die het
+# scheelt.
+
+CHARGING_DATA = "Charging_data.pkl"
+GROOTHEDEN = ["aangesloten", "kwh"]
+
+HORIZON_DAGEN = 28
+HOLDOUT_DAGEN = 14  # backtest voor de MAE per segment
+HALVERINGSTIJD_DAGEN = 180
+BAND_DAGEN = 56
+BAND = (0.1, 0.9)
+FOURIER = 2
+RIDGE = 1.0
+CHUNK_RIJEN = 1_000_000
+
+
+def bron_naam(pad):
+    return os.path.splitext(os.path.basename(pad))[0]
+
+
+def sessies_uit_pkl(pad=CHARGING_DATA):
+    """Charging_data.pkl in het schema van laadpaaldata.csv, zelfde opschoning."""
+    ruw = pd.read_pickle(pad)
+    begin, einde = ruw["start_time"], ruw["exit_time"]
+    return li.schoon_sessies(pd.DataFrame({
+        "Started": begin,
+        "Ended": einde,
+        "TotalEnergy": ruw["energy_delivered [kWh]"].astype("float64") * 1000,
+        "ConnectedTime": (einde - begin) / pd.Timedelta(hours=1),
+        "ChargeTime": pd.to_timedelta(ruw["charging_duration"], errors="coerce") / pd.Timedelta(hours=1),
+        "MaxPower": ruw["max_charging_power [kW]"].astype("float64") * 1000,
+    }))
+
+
+def historie(blokken, eerste, laatste):
+    """Uurreeksen per laadtype uit opgeschoonde sessies.
+
+    blokken is een iterable van sessieframes (één frame, of de blokken van
+    een gestreamde CSV); bezetting is optelbaar dus ze worden opgeteld.
+    Geeft {"begin", "aangesloten": (uren, types), "kwh": (uren, types)}:
+    het gemiddeld aantal aangesloten auto's per uur en de geleverde kWh,
+    met de energie gelijk verdeeld over de laadtijd.
+    """
+    begin = pd.Timestamp(eerste).normalize()
+    raster = pd.date_range(begin, pd.Timestamp(laatste).normalize() + pd.Timedelta(days=1),
+                           freq="1min", inclusive="left").to_numpy(dtype="datetime64[ns]")
+    stap = np.timedelta64(1, "m")
+
+    aangesloten = np.zeros((len(raster), len(lb.LAADTYPES)))
+    vermogen = np.zeros((len(raster), len(lb.LAADTYPES)))
+    for blok in blokken:
+        start = blok["Started"].dt.round("min")
+        laadtijd = blok["ChargeTime"].to_numpy(dtype="float64")
+        eind_laden = (blok["Started"] + pd.to_timedelta(laadtijd, unit="h")).dt.round("min")
+        # Gemiddeld vermogen over de laadtijd, in kW
+        kw = np.divide(blok["TotalEnergy"].to_numpy(dtype="float64") / 1000, laadtijd,
+                       out=np.zeros(len(blok)), where=laadtijd > 0)
+        soort = blok["AC or DC?"].to_numpy()
+
+        aangesloten += lb.bezetting_matrix(
+            start.to_numpy(dtype="datetime64[ns]"),
+            blok["Ended"].dt.round("min").to_numpy(dtype="datetime64[ns]") + stap,
+            soort, raster, lb.LAADTYPES)
+        vermogen += lb.bezetting_matrix(
+            start.to_numpy(dtype="datetime64[ns]"), eind_laden.to_numpy(dtype="datetime64[ns]"),
+            soort, raster, lb.LAADTYPES, gewicht=kw)
+
+    uren = len(raster) // 60
+    return {
+        "begin": begin,
+        "aangesloten": aangesloten.reshape(uren, 60, -1).mean(axis=1),
+        "kwh": vermogen.reshape(uren, 60, -1).sum(axis=1) / 60,
+    }
+
+
+def kenmerken(tijden, begin):
+    """Seizoensfeatures voor een uurlijkse DatetimeIndex: (uren, 168 + 1 + 2 * FOURIER)."""
+    X = np.zeros((len(tijden), 168 + 1 + 2 * FOURIER))
+    X[np.arange(len(tijden)), tijden.dayofweek * 24 + tijden.hour] = 1
+    X[:, 168] = (tijden - begin) / pd.Timedelta(days=365.25)
+    jaar = 2 * np.pi * tijden.dayofyear.to_numpy() / 365.25
+    for k in range(1, FOURIER + 1):
+        X[:, 167 + 2 * k] = np.sin(k * jaar)
+        X[:, 168 + 2 * k] = np.cos(k * jaar)
+    return X
+
+
+def _fit(X, y, gewicht):
+    Xw = X * gewicht[:, None]
+    return np.linalg.solve(X.T @ Xw + RIDGE * np.eye(X.shape[1]), Xw.T @ y)
+
+
+def voorspel_segment(y, begin, horizon_dagen=HORIZON_DAGEN):
+    """Voorspelling met band voor één uurreeks die op middernacht begint.
+
+    Eerst een backtest op de laatste HOLDOUT_DAGEN (MAE), daarna een fit op
+    alles. Geeft (frame met Uur, voorspelling, onder, boven; mae).
+    """
+    tijden = pd.date_range(begin, periods=len(y), freq="h")
+    X = kenmerken(tijden, begin)
+    leeftijd_dagen = np.arange(len(y))[::-1] / 24
+    gewicht = 0.5 ** (leeftijd_dagen / HALVERINGSTIJD_DAGEN)
+
+    h = HOLDOUT_DAGEN * 24
+    mae = np.nan
+    if len(y) > 2 * h:
+        beta = _fit(X[:-h], y[:-h], gewicht[:-h])
+        mae = float(np.abs(np.clip(X[-h:] @ beta, 0, None) - y[-h:]).mean())
+
+    beta = _fit(X, y, gewicht)
+    # Band per uur van de dag uit de residuen van de laatste weken
+    residu = (y - X @ beta)[-BAND_DAGEN * 24:].reshape(-1, 24)
+    onder, boven = np.quantile(residu, BAND, axis=0)
+
+    toekomst = pd.date_range(tijden[-1] + pd.Timedelta(hours=1), periods=horizon_dagen * 24, freq="h")
+    schatting = kenmerken(toekomst, begin) @ beta
+    uur = toekomst.hour.to_numpy()
+    return pd.DataFrame({
+        "Uur": toekomst,
+        "voorspelling": np.clip(schatting, 0, None),
+        "onder": np.clip(schatting + onder[uur], 0, None),
+        "boven": np.clip(schatting + boven[uur], 0, None),
+    }), mae
+
+
+def train(historien, horizon_dagen=HORIZON_DAGEN):
+    """Alle segmenten van {bron: historie(...)}, na elkaar.
+
+    Geeft (voorspelling, kwaliteit): één lang frame met bron, AC or DC?,
+    grootheid, Uur en de band, en de backtest-MAE per segment.
+    """
+    taken = [(bron, k, grootheid) for bron in historien
+             for k in range(len(lb.LAADTYPES)) for grootheid in GROOTHEDEN]
+    uitslagen = [voorspel_segment(historien[b][g][:, k], historien[b]["begin"], horizon_dagen)
+                 for b, k, g in taken]
+
+    frames, kwaliteit = [], []
+    for (bron, k, grootheid), (frame, mae) in zip(taken, uitslagen):
+        segment = {"bron": bron, "AC or DC?": lb.LAADTYPES[k], "grootheid": grootheid}
+        frames.append(frame.assign(**segment))
+        kwaliteit.append({**segment, "mae": mae})
+    return pd.concat(frames, ignore_index=True), pd.DataFrame(kwaliteit)
+
+
+def voorspelling_pad(pad, sleutel):
+    return li.cache_pad(pad, sleutel, extensie=".voorspelling.pkl")
+
+
+def bron_sleutel(pad, pkl=CHARGING_DATA):
+    # Versie van alle bronnen samen; een nieuwe versie van één ervan traint opnieuw
+    return "_".join(li.cache_sleutel(p) for p in [pad, pkl] if os.path.exists(p))
+
+
+def laad_voorspelling(pad="laadpaaldata.csv", laaddata=None, eerste=None, laatste=None,
+                      pkl=CHARGING_DATA):
+    """Voorspelling voor deze versie van de bronnen van schijf, of opnieuw trainen.
+
+    Zonder laaddata maar met eerste en laatste (grote export, zie
+    ls.laadpaal_data) wordt de CSV in blokken gelezen; zonder beide worden
+    de sessies ingeladen.
+    """
+    sleutel = bron_sleutel(pad, pkl)
+    bestand = voorspelling_pad(pad, sleutel)
+    if os.path.exists(bestand):
+        return pd.read_pickle(bestand)
+
+    if laaddata is None and eerste is None:
+        laaddata = li.laad_sessies(pad)
+    if laaddata is not None:
+        blokken = [laaddata]
+        eerste, laatste = laaddata["Started"].min(), laaddata["Started"].max()
+    else:
+        blokken = (li.schoon_sessies(blok) for blok in li.lees_csv(pad, chunksize=CHUNK_RIJEN))
+    historien = {bron_naam(pad): historie(blokken, eerste, laatste)}
+    if os.path.exists(pkl):
+        sessies = sessies_uit_pkl(pkl)
+        historien[bron_naam(pkl)] = historie([sessies], sessies["Started"].min(), sessies["Started"].max())
+
+    voorspelling, kwaliteit = train(historien)
+    uitkomst = {"voorspelling": voorspelling, "kwaliteit": kwaliteit, "horizon_dagen": HORIZON_DAGEN}
+
+    for oud in glob.glob(voorspelling_pad(pad, "*")):
+        os.remove(oud)
+    tijdelijk = bestand + ".tmp"
+    pd.to_pickle(uitkomst, tijdelijk)
+    os.replace(tijdelijk, bestand)
+    return uitkomst
+
+
+def segment(voorspelling, bron, grootheid, begin=None, einde=None):
+    """Het stuk van de voorspelling voor één bron en grootheid, optioneel [begin, einde)."""
+    deel = voorspelling[(voorspelling["bron"] == bron) & (voorspelling["grootheid"] == grootheid)]
+    if begin is not None:
+        deel = deel[(deel["Uur"] >= pd.Timestamp(begin)) & (deel["Uur"] < pd.Timestamp(einde))]
+    return deel
+
+
+if __name__ == "__main__":
+    uitkomst = laad_voorspelling()
+    print(uitkomst["kwaliteit"].to_string(index=False))
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import profiel
+
+# --- OpenChargeMap client ---
+# Eén gedeelde sessie met connection pool, een TTL-cache op schijf en een
+# offline modus op basis van een lokale snapshot. Nederland wordt in tegels
+# (bounding boxes) opgehaald, die tegelijk via een threadpool lopen. Komt
+# een tegel vol terug (maxresults), dan is hij afgekapt en wordt hij in
+# vier kleinere tegels opnieuw opgevraagd, tot elke tegel compleet is.
+#
+# De snapshot (laadpalen_snapshot.json, of OCM_SNAPSHOT) staat niet in git:
+# hij wordt geschreven na elke geslaagde online ophaalronde. Maak hem één
+# keer aan met netwerk, daarna werkt OCM_OFFLINE=1:
+#     python -c "import openChargeMap as ocm; ocm.laadpalen_json()"
+
+API_URL = os.environ.get("OCM_URL", "https://api.openchargemap.io/v3/poi/")
+API_KEY = os.environ.get("OCM_API_KEY", "5d087822-ce71-42b0-a231-67209f0900a2")
+
+CACHE_MAP = os.environ.get("OCM_CACHE", ".ocm_cache")
+CACHE_TTL = 24 * 3600  # seconden
+SNAPSHOT = os.environ.get("OCM_SNAPSHOT", "laadpalen_snapshot.json")
+OFFLINE = os.environ.get("OCM_OFFLINE", "0") == "1"
+
+# Zuidwest- en noordoosthoek van Nederland
+NL_BBOX = ((50.75, 3.35), (53.55, 7.23))
+# Zo vaak mag een volle tegel nog gesplitst worden (4^6 deeltegels per tegel)
+MAX_SPLITSINGEN = 6
+
+_sessie = None
+
+
+def sessie():
+    global _sessie
+    if _sessie is None:
+        _sessie = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8,
+                              max_retries=Retry(total=3, backoff_factor=0.5,
+                                                status_forcelist=[429, 500, 502, 503, 504]))
+        _sessie.mount("http://", adapter)
+        _sessie.mount("https://", adapter)
+    return _sessie
+
+
+def tegels(bbox=NL_BBOX, rijen=2, kolommen=2):
+    """Verdeel een bounding box in rijen x kolommen kleinere boxen."""
+    (lat0, lon0), (lat1, lon1) = bbox
+    dlat = (lat1 - lat0) / rijen
+    dlon = (lon1 - lon0) / kolommen
+    return [
+        ((lat0 + i * dlat, lon0 + j * dlon), (lat0 + (i + 1) * dlat, lon0 + (j + 1) * dlon))
+        for i in range(rijen) for j in range(kolommen)
+    ]
+
+
+def _cache_bestand(params):
+    sleutel = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return os.path.join(CACHE_MAP, sleutel + ".json")
+
+
+def _lees_json(pad):
+    with open(pad, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _schrijf_json(pad, data):
+    map_ = os.path.dirname(pad)
+    if map_:
+        os.makedirs(map_, exist_ok=True)
+    tijdelijk = pad + ".tmp"
+    with open(tijdelijk, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tijdelijk, pad)
+
+
+def haal_op(params, ttl=CACHE_TTL, timeout=30):
+    """Eén API-aanroep, via de cache op schijf als die nog vers is.
+
+    Lukt de aanroep niet, dan wordt een verlopen cache-bestand gebruikt als
+    dat er is.
+    """
+    params = {"output": "json", "compact": "true", "verbose": "false", "key": API_KEY, **params}
+    pad = _cache_bestand(params)
+
+    if os.path.exists(pad) and time.time() - os.path.getmtime(pad) < ttl:
+        return _lees_json(pad)
+
+    try:
+        antwoord = sessie().get(API_URL, params=params, timeout=timeout)
+        antwoord.raise_for_status()
+        data = antwoord.json()
+    except (requests.RequestException, ValueError):
+        if os.path.exists(pad):
+            return _lees_json(pad)
+        raise
+
+    _schrijf_json(pad, data)
+    return data
+
+
+def _verzoek(tegel, maxresults):
+    zw, no = tegel
+    return {"countrycode": "NL",
+            "maxresults": maxresults,
+            "boundingbox": f"({zw[0]:.5f},{zw[1]:.5f}),({no[0]:.5f},{no[1]:.5f})"}
+
+
+def haal_tegels(open_tegels, maxresults, ttl=CACHE_TTL, max_splitsingen=MAX_SPLITSINGEN):
+    """POI-lijsten van alle tegels, met volle tegels gesplitst tot ze compleet zijn.
+
+    Per ronde gaan alle open tegels tegelijk door de threadpool. Is een tegel
+    na max_splitsingen nog vol, dan volgt een ValueError: liever geen data
+    dan een stil afgekapte set.
+    """
+    delen = []
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(max_splitsingen + 1):
+            uitslagen = list(pool.map(lambda t: haal_op(_verzoek(t, maxresults), ttl=ttl), open_tegels))
+            vol = [t for t, deel in zip(open_tegels, uitslagen) if len(deel) >= maxresults]
+            delen += [deel for deel in uitslagen if len(deel) < maxresults]
+            if not vol:
+                return delen
+            open_tegels = [kleiner for t in vol for kleiner in tegels(t)]
+    raise ValueError(f"{len(vol)} tegels hebben na {max_splitsingen} splitsingen nog {maxresults} laadpalen")
+
+
+def laadpalen_json(maxresults=1000, rijen=2, kolommen=2, offline=OFFLINE, ttl=CACHE_TTL):
+    """Alle laadpalen in Nederland als lijst van POI-dicts (ontdubbeld op ID).
+
+    In offline modus, of als het netwerk het niet doet, komt alles uit de
+    snapshot. Na een geslaagde, complete online ophaalronde wordt die
+    snapshot ververst.
+    """
+    if offline:
+        if not os.path.exists(SNAPSHOT):
+            raise FileNotFoundError(
+                f"Geen snapshot {SNAPSHOT} voor offline modus; maak hem online aan met "
+                '`python -c "import openChargeMap as ocm; ocm.laadpalen_json()"`')
+        return _lees_json(SNAPSHOT)
+
+    try:
+        delen = haal_tegels(tegels(NL_BBOX, rijen, kolommen), maxresults, ttl=ttl)
+    except (requests.RequestException, ValueError):
+        if os.path.exists(SNAPSHOT):
+            return _lees_json(SNAPSHOT)
+        raise
+
+    gezien = set()
+    pois = []
+    for deel in delen:
+        for poi in deel:
+            if poi.get("ID") not in gezien:
+                gezien.add(poi.get("ID"))
+                pois.append(poi)
+
+    _schrijf_json(SNAPSHOT, pois)
+    return pois
+
+
+def naar_frame(pois):
+    """Platte tabel zoals lp_map die gebruikt: POI-velden plus de eerste aansluiting."""
+    laadpalen = pd.json_normalize(pois)
+    eerste = pd.json_normalize([(p.get("Connections") or [{}])[0] or {} for p in pois])
+    if "PowerKW" not in eerste:
+        eerste["PowerKW"] = None
+    return pd.concat([laadpalen.drop(columns=["Connections"], errors="ignore"), eerste], axis=1)
+
+
+@profiel.gemeten("ocm.laadpalen")
+def laadpalen(**kwargs):
+    return naar_frame(laadpalen_json(**kwargs))
+
+
+def versie(laadpalen):
+    """Hash van ID en coördinaten, als sleutel voor kaarten en indexen."""
+    return int(pd.util.hash_pandas_object(laadpalen.reindex(columns=["ID", "AddressInfo.Latitude", "AddressInfo.Longitude"]),
+                                          index=False).sum())
+
+
+def locaties(laadpalen):
+    """Laadpalen met geldige coördinaten, hun provincie en de ruimtelijke index."""
+    import ruimtelijkeIndex as ri
+
+    # Filter de Laadpalen DataFrame op geldige coördinaten
+    Laadpaal_locatie = laadpalen.reindex(columns=[
+        "AddressInfo.AddressLine1",
+        "AddressInfo.Latitude",
+        "AddressInfo.Longitude",
+        "AddressInfo.StateOrProvince",
+        "AddressInfo.Postcode",
+        "DateCreated",
+        "PowerKW"
+    ]).dropna(subset=["AddressInfo.Latitude", "AddressInfo.Longitude"]).reset_index(drop=True)
+
+    Laadpaal_locatie["Provincie"] = ri.provincie_per_punt(
+        Laadpaal_locatie["AddressInfo.Latitude"],
+        Laadpaal_locatie["AddressInfo.Longitude"],
+        Laadpaal_locatie["AddressInfo.StateOrProvince"],
+    )
+    index = ri.bouw_index(Laadpaal_locatie["AddressInfo.Latitude"], Laadpaal_locatie["AddressInfo.Longitude"])
+    return Laadpaal_locatie, index
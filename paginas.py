@@ -0,0 +1,21 @@
+import importlib
+
+# --- Paginaregister ---
+# Per pagina de (module, functie)-paren die getekend worden. De modules
+# (en daarmee sklearn, folium, de voertuigdata, ...) worden pas
+# geïmporteerd als de pagina gekozen is.
+
+PAGINAS = {
+    "🚗 Auto Dashboard": [("GeodataEnCars", "car_data"), ("ElectricCars", "carsy")],
+    "⚡Laadpalen Data": [("laadpaalData", "laadpaal")],
+}
+
+
+def modules(pagina):
+    return [module for module, _ in PAGINAS[pagina]]
+
+
+def toon(pagina):
+    for module, functie in PAGINAS[pagina]:
+        getattr(importlib.import_module(module), functie)()
+
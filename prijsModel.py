@@ -0,0 +1,352 @@
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.metrics import mean_absolute_error, r2_score
+
+import laadpaalInlezen as li
+import voertuigData as vd
+
+# --- Catalogusprijs-model ---
+# Eén keer trainen per versie van cars.pkl; het gefitte model en de
+# testset-voorspellingen worden naast cars.pkl bewaard, zodat het dashboard
+# alleen nog hoeft te laden.
+
+FEATURES = ['massa_ledig_voertuig', 'vermogen_massarijklaar', 'lengte', 'breedte', 'hoogte_voertuig']
+DOEL = 'catalogusprijs'
+CHUNK_RIJEN = 1_000_000
+
+# Kandidaten voor de vergelijking; op naam, zodat alleen de naam naar de
+# worker-processen gaat en het model daar pas gemaakt wordt
+MODELLEN = {
+    "Linear": lambda: LinearRegression(),
+    "Ridge": lambda: Ridge(alpha=1.0),
+    "GradientBoosting": lambda: HistGradientBoostingRegressor(random_state=42),
+    "RandomForest": lambda: RandomForestRegressor(n_estimators=100, min_samples_leaf=5, n_jobs=1, random_state=42),
+}
+STANDAARD_MODEL = "Linear"
+FOLDS = 5
+
+# Incrementeel bijgehouden OLS: elke HOLDOUT_STAP-de rij gaat naar de
+# holdout, waarvan de laatste HOLDOUT_RIJEN bewaard worden
+HOLDOUT_STAP = 5
+HOLDOUT_RIJEN = 50_000
+
+
+def trainingsdata(cars):
+    # Verwijder rijen zonder prijs of met veel missende waarden
+    cars2 = cars.dropna(subset=[DOEL, 'massa_ledig_voertuig', 'vermogen_massarijklaar'])
+
+    # Feature selectie
+    X = cars2[FEATURES].dropna()
+    y = cars2[DOEL].loc[X.index]
+    return X, y
+
+
+def train(cars, model=None):
+    """Fit op een vaste 80/20-split en geef alle artefacten voor het dashboard terug."""
+    X, y = trainingsdata(cars)
+
+    # Train/test split
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    model = MODELLEN[STANDAARD_MODEL]() if model is None else model
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    return {
+        "model": model,
+        "features": FEATURES,
+        "y_test": y_test.to_numpy(),
+        "y_pred": y_pred,
+        "r2": r2_score(y_test, y_pred),
+        "mae": mean_absolute_error(y_test, y_pred),
+        "n_train": len(X_train),
+    }
+
+
+def model_pad(pad, sleutel):
+    return li.cache_pad(os.path.join(os.path.dirname(pad), "cars_prijsmodel"), sleutel, extensie=".pkl")
+
+
+def leaderboard_pad(pad, sleutel):
+    return li.cache_pad(os.path.join(os.path.dirname(pad), "cars_leaderboard"), sleutel, extensie=".pkl")
+
+
+def _bewaar(bestand, patroon, data):
+    for oud in glob.glob(patroon):
+        os.remove(oud)
+    tijdelijk = bestand + ".tmp"
+    pd.to_pickle(data, tijdelijk)
+    os.replace(tijdelijk, bestand)
+
+
+# --- Modelvergelijking met k-fold cross-validatie ---
+# X, y en de folds gaan één keer per worker mee (initializer), de taken
+# zelf zijn alleen (model, foldnummer).
+
+_fold_data = {}
+
+
+def _zet_fold_data(X, y, folds):
+    _fold_data["X"] = X
+    _fold_data["y"] = y
+    _fold_data["splits"] = list(KFold(n_splits=folds, shuffle=True, random_state=42).split(X))
+
+
+def _score_fold(naam, fold):
+    X, y = _fold_data["X"], _fold_data["y"]
+    train_idx, test_idx = _fold_data["splits"][fold]
+    model = MODELLEN[naam]()
+
+    t0 = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    t1 = time.perf_counter()
+    y_pred = model.predict(X[test_idx])
+    t2 = time.perf_counter()
+
+    return {
+        "model": naam,
+        "r2": r2_score(y[test_idx], y_pred),
+        "mae": mean_absolute_error(y[test_idx], y_pred),
+        "fit_s": t1 - t0,
+        "predict_s": t2 - t1,
+    }
+
+
+def vergelijk_modellen(cars, modellen=None, folds=FOLDS, processen=None):
+    """Leaderboard (gemiddelde over de folds) van alle kandidaat-modellen.
+
+    Elke (model, fold)-combinatie is een losse taak in een procespool, zodat
+    de trage modellen over alle cores verdeeld worden. De trainingsmatrix
+    gaat één keer per worker mee, niet per taak.
+    """
+    modellen = list(MODELLEN) if modellen is None else modellen
+    X, y = trainingsdata(cars)
+    X = X.to_numpy(dtype="float64")
+    y = y.to_numpy(dtype="float64")
+
+    taken = [(naam, fold) for naam in modellen for fold in range(folds)]
+    with ProcessPoolExecutor(max_workers=processen, initializer=_zet_fold_data,
+                             initargs=(X, y, folds)) as pool:
+        uitslagen = list(pool.map(_score_fold, [t[0] for t in taken], [t[1] for t in taken]))
+
+    per_fold = pd.DataFrame(uitslagen)
+    return (
+        per_fold.groupby("model")
+            .agg(r2=("r2", "mean"), r2_std=("r2", "std"), mae=("mae", "mean"),
+                 fit_s=("fit_s", "mean"), predict_s=("predict_s", "mean"))
+            .sort_values("r2", ascending=False)
+            .reset_index()
+            .assign(folds=folds, n=len(y))
+    )
+
+
+def laad_leaderboard(pad='cars.pkl'):
+    """Opgeslagen leaderboard voor deze versie van cars.pkl, of None."""
+    bestand = leaderboard_pad(pad, li.cache_sleutel(pad))
+    return pd.read_pickle(bestand) if os.path.exists(bestand) else None
+
+
+def bewaar_leaderboard(pad='cars.pkl', **kwargs):
+    leaderboard = vergelijk_modellen(vd.laad_voertuigen(pad), **kwargs)
+    _bewaar(leaderboard_pad(pad, li.cache_sleutel(pad)), leaderboard_pad(pad, "*"), leaderboard)
+    return leaderboard
+
+
+# --- Incrementeel OLS-model ---
+# Het lineaire model wordt niet opnieuw op de hele tabel gefit: XᵀX en Xᵀy
+# zijn optelbaar, dus alleen de rijen na stats["laatste_rij"] (positie in
+# cars.pkl, dat alleen aangevuld wordt) worden erbij geteld. De uitkomst is
+# gelijk aan LinearRegression op dezelfde trainingsrijen. Een vingerafdruk
+# van de kentekens tot en met laatste_rij bewaakt dat: is cars.pkl opnieuw
+# gesorteerd of verbeterd, dan wordt opnieuw begonnen.
+
+def online_pad(pad):
+    return os.path.join(os.path.dirname(pad), ".cars_prijsmodel_online.pkl")
+
+
+def lege_statistiek():
+    k = len(FEATURES) + 1
+    return {
+        "laatste_rij": -1,
+        "vingerafdruk": None,
+        "n": 0,
+        "xtx": np.zeros((k, k)),
+        "xty": np.zeros(k),
+        "holdout_X": np.empty((0, len(FEATURES))),
+        "holdout_y": np.empty(0),
+        "evaluaties": [],
+    }
+
+
+def _rij_hashes(cars):
+    # Per positie een hash van het kenteken, of van de modelkolommen zonder kenteken
+    kolommen = ["kenteken"] if "kenteken" in cars.columns else FEATURES + [DOEL]
+    return pd.Series(pd.util.hash_pandas_object(cars[kolommen], index=False).to_numpy())
+
+
+def _met_constante(X):
+    return np.column_stack([np.ones(len(X)), X])
+
+
+def online_model(stats):
+    """LinearRegression met de coëfficiënten uit de opgetelde XᵀX en Xᵀy."""
+    beta = np.linalg.lstsq(stats["xtx"], stats["xty"], rcond=None)[0]
+    model = LinearRegression()
+    model.intercept_ = beta[0]
+    model.coef_ = beta[1:]
+    model.n_features_in_ = len(FEATURES)
+    model.feature_names_in_ = np.array(FEATURES, dtype=object)
+    return model
+
+
+def werk_bij(stats, nieuw, start):
+    """Tel de rijen van nieuw (beginnend op positie start) op bij stats."""
+    X, y = trainingsdata(nieuw)
+    positie = start + nieuw.index.get_indexer(X.index)
+    X = X.to_numpy(dtype="float64")
+    y = y.to_numpy(dtype="float64")
+
+    holdout = positie % HOLDOUT_STAP == 0
+    Xc = _met_constante(X[~holdout])
+    stats["xtx"] += Xc.T @ Xc
+    stats["xty"] += Xc.T @ y[~holdout]
+    stats["n"] += int((~holdout).sum())
+
+    # Rollende holdout: alleen de nieuwste HOLDOUT_RIJEN blijven
+    stats["holdout_X"] = np.concatenate([stats["holdout_X"], X[holdout]])[-HOLDOUT_RIJEN:]
+    stats["holdout_y"] = np.concatenate([stats["holdout_y"], y[holdout]])[-HOLDOUT_RIJEN:]
+    stats["laatste_rij"] = start + len(nieuw) - 1
+    return stats
+
+
+def online_artefacten(stats):
+    model = online_model(stats)
+    y_test = stats["holdout_y"]
+    y_pred = model.predict(pd.DataFrame(stats["holdout_X"], columns=FEATURES)) if len(y_test) else np.empty(0)
+    return {
+        "model": model,
+        "naam": STANDAARD_MODEL,
+        "features": FEATURES,
+        "y_test": y_test,
+        "y_pred": y_pred,
+        "r2": r2_score(y_test, y_pred) if len(y_test) > 1 else np.nan,
+        "mae": mean_absolute_error(y_test, y_pred) if len(y_test) else np.nan,
+        "n_train": stats["n"],
+        "evaluaties": stats["evaluaties"],
+    }
+
+
+def laad_online(pad='cars.pkl', cars=None):
+    """Het incrementele model, bijgewerkt met alleen de nieuwe registraties.
+
+    Is cars.pkl korter geworden dan wat al geteld is, of kloppen de al
+    getelde kentekens niet meer (opnieuw gesorteerd of verbeterd), dan wordt
+    opnieuw begonnen. Na elke update wordt de rollende holdout opnieuw gescoord en
+    aan stats["evaluaties"] toegevoegd.
+    """
+    bestand = online_pad(pad)
+    try:
+        stats = pd.read_pickle(bestand)
+    except (FileNotFoundError, EOFError):
+        stats = None
+
+    cars = vd.laad_voertuigen(pad) if cars is None else cars
+    hashes = _rij_hashes(cars)
+    if (stats is None or stats["laatste_rij"] >= len(cars)
+            or stats.get("vingerafdruk") != li.vingerafdruk(hashes, stats["laatste_rij"])):
+        stats = lege_statistiek()
+
+    start = stats["laatste_rij"] + 1
+    if start >= len(cars) and stats["n"] > 0:
+        return online_artefacten(stats)
+
+    stats = werk_bij(stats, cars.iloc[start:], start)
+    stats["vingerafdruk"] = li.vingerafdruk(hashes, stats["laatste_rij"])
+    artefacten = online_artefacten(stats)
+    stats["evaluaties"].append({"laatste_rij": stats["laatste_rij"], "n_train": stats["n"],
+                                "r2": artefacten["r2"], "mae": artefacten["mae"]})
+
+    tijdelijk = bestand + ".tmp"
+    pd.to_pickle(stats, tijdelijk)
+    os.replace(tijdelijk, bestand)
+    return artefacten
+
+
+def laad_of_train(pad='cars.pkl', cars=None):
+    """Artefacten voor deze versie van cars.pkl van schijf, of één keer trainen.
+
+    Als er een leaderboard voor deze versie is, wordt de winnaar getraind.
+    Het lineaire standaardmodel loopt via het incrementele pad. cars zijn
+    de al ingeladen voertuigen, anders worden ze van schijf gelezen.
+    """
+    sleutel = li.cache_sleutel(pad)
+    leaderboard = laad_leaderboard(pad)
+    naam = STANDAARD_MODEL if leaderboard is None else leaderboard["model"].iloc[0]
+    if naam == STANDAARD_MODEL:
+        return laad_online(pad, cars)
+
+    bestand = model_pad(pad, sleutel)
+    if os.path.exists(bestand):
+        artefacten = pd.read_pickle(bestand)
+        if artefacten.get("naam") == naam:
+            return artefacten
+
+    cars = vd.laad_voertuigen(pad) if cars is None else cars
+    artefacten = train(cars, MODELLEN[naam]())
+    artefacten["naam"] = naam
+    _bewaar(bestand, model_pad(pad, "*"), artefacten)
+
+    return artefacten
+
+
+def predict_prices(frame, artefacten=None, chunk_rijen=CHUNK_RIJEN):
+    """Voorspelde catalogusprijs voor elke rij van frame (NaN bij missende features).
+
+    Werkt in blokken van chunk_rijen, zodat ook de hele registratietabel
+    gescoord kan worden zonder een grote tussenmatrix.
+    """
+    artefacten = laad_of_train() if artefacten is None else artefacten
+    model, features = artefacten["model"], artefacten["features"]
+
+    prijzen = np.full(len(frame), np.nan)
+    for begin in range(0, len(frame), chunk_rijen):
+        blok = frame.iloc[begin:begin + chunk_rijen][features].apply(pd.to_numeric, errors='coerce')
+        X = blok.to_numpy(dtype="float64")
+        compleet = ~np.isnan(X).any(axis=1)
+        if compleet.any():
+            prijzen[begin:begin + chunk_rijen][compleet] = model.predict(
+                pd.DataFrame(X[compleet], columns=features))
+
+    return pd.Series(prijzen, index=frame.index, name="voorspelde_prijs")
+
+
+if __name__ == "__main__":
+    # Modellen vergelijken: python prijsModel.py --vergelijk [cars.pkl]
+    if sys.argv[1:2] == ["--vergelijk"]:
+        bron = sys.argv[2] if len(sys.argv) > 2 else 'cars.pkl'
+        print(bewaar_leaderboard(bron).to_string(index=False))
+        sys.exit()
+
+    # Incrementeel model bijwerken met de nieuwe registraties: python prijsModel.py --bijwerken [cars.pkl]
+    if sys.argv[1:2] == ["--bijwerken"]:
+        bron = sys.argv[2] if len(sys.argv) > 2 else 'cars.pkl'
+        print(pd.DataFrame(laad_online(bron)["evaluaties"]).tail().to_string(index=False))
+        sys.exit()
+
+    # Offline de hele registratietabel prijzen: python prijsModel.py [cars.pkl] [uitvoer.parquet]
+    bron = sys.argv[1] if len(sys.argv) > 1 else 'cars.pkl'
+    uitvoer = sys.argv[2] if len(sys.argv) > 2 else 'cars_prijzen.parquet'
+
+    cars = vd.laad_voertuigen(bron)
+    prijzen = predict_prices(cars, laad_of_train(bron))
+    pd.DataFrame({"kenteken": cars.get("kenteken", cars.index), "voorspelde_prijs": prijzen}).to_parquet(uitvoer)
+    print(f"{prijzen.notna().sum()} van {len(cars)} voertuigen geprijsd -> {uitvoer}")
@@ -0,0 +1,109 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+# --- Metingen per render ---
+# stap() en gemeten() om de dure stukken van een pagina: duur, aantal rijen
+# en de verandering in geheugengebruik (RSS) van het proces. Staat het
+# profiel uit, dan geeft stap() één gedeelde lege context terug en kost het
+# vrijwel niets. Elke Streamlit-render loopt in zijn eigen thread, dus de
+# metingen worden per thread bijgehouden.
+
+STANDAARD = os.environ.get("PROFIEL", "0") == "1"
+# Optioneel: elke meting als JSON-regel naar dit bestand
+LOG_BESTAND = os.environ.get("PROFIEL_LOG")
+
+log = logging.getLogger("dashboard.profiel")
+
+_lokaal = threading.local()
+_leeg = contextlib.nullcontext({})
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_schrijf_slot = threading.Lock()
+
+
+def _rss_mb():
+    # Alleen Linux; elders wordt het geheugen niet gemeten
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGINA / 1024**2
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def begin_render(aan=STANDAARD, pagina=None):
+    """Aan het begin van elke render: metingen leegmaken en aan/uit zetten."""
+    _lokaal.aan = aan
+    _lokaal.pagina = pagina
+    _lokaal.metingen = []
+
+
+def aan():
+    return getattr(_lokaal, "aan", False)
+
+
+def metingen():
+    return list(getattr(_lokaal, "metingen", []))
+
+
+@contextlib.contextmanager
+def _meet(naam, rijen):
+    meting = {"stap": naam, "rijen": rijen}
+    geheugen = _rss_mb()
+    begin = time.perf_counter()
+    try:
+        yield meting
+    finally:
+        meting["duur_ms"] = round((time.perf_counter() - begin) * 1000, 2)
+        na = _rss_mb()
+        meting["geheugen_mb"] = None if geheugen is None or na is None else round(na - geheugen, 1)
+        _bewaar(meting)
+
+
+def stap(naam, rijen=None):
+    """Context om een stap te meten; zet meting["rijen"] binnen het blok als
+    het aantal rijen pas achteraf bekend is."""
+    if not getattr(_lokaal, "aan", False):
+        return _leeg
+    return _meet(naam, rijen)
+
+
+def gemeten(naam=None):
+    """Decorator-variant van stap(); rijen = lengte van de uitkomst als die
+    een tabel of array is."""
+    def decorator(functie):
+        label = naam or f"{functie.__module__}.{functie.__name__}"
+
+        @functools.wraps(functie)
+        def omhulsel(*args, **kwargs):
+            if not getattr(_lokaal, "aan", False):
+                return functie(*args, **kwargs)
+            with _meet(label, None) as meting:
+                uitkomst = functie(*args, **kwargs)
+                if hasattr(uitkomst, "shape"):
+                    meting["rijen"] = uitkomst.shape[0]
+            return uitkomst
+        return omhulsel
+    return decorator
+
+
+def _bewaar(meting):
+    meting["pagina"] = getattr(_lokaal, "pagina", None)
+    meting["tijd"] = time.time()
+    getattr(_lokaal, "metingen", []).append(meting)
+
+    log.debug("%s", meting)
+    if LOG_BESTAND:
+        with _schrijf_slot, open(LOG_BESTAND, "a", encoding="utf-8") as f:
+            f.write(json.dumps(meting) + "\n")
+
+
+def tabel():
+    """Metingen van deze render als DataFrame, voor het debugpaneel."""
+    import pandas as pd
+
+    kolommen = ["stap", "duur_ms", "rijen", "geheugen_mb"]
+    return pd.DataFrame(metingen(), columns=kolommen + ["pagina", "tijd"])[kolommen]
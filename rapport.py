@@ -0,0 +1,259 @@
+import datetime
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import autoGrafieken as ag
+import laadpaalAnalyse as la
+import laadpaalBezetting as lb
+import laadpaalGrafieken as lg
+import laadpaalInlezen as li
+import laadpaalStream as ls
+import laadpaalVoorspelling as lv
+
+# --- Batchrapport zonder Streamlit ---
+# Bouwt dezelfde figuren als het dashboard, direct uit de data en de caches
+# op schijf, en schrijft ze in een procespool weg (HTML, JSON of statisch
+# via kaleido). Geen Streamlit-server en geen netwerk: de laadpalenkaart
+# komt uit de OpenChargeMap-snapshot. Alles komt in één map met een
+# manifest.json.
+#
+#   python rapport.py [--uit rapport] [--formaat html,png] [--dagen 2018-01-01:2018-12-31]
+#                     [--processen N] [--zonder auto,dichtheid,kaart]
+
+LAADDATA = "laadpaaldata.csv"
+CARS = "cars.pkl"
+STATISCH = {"png", "jpg", "svg", "pdf"}
+
+
+# --- Figuren als (naam, maak)-paren ---
+# maak() bouwt de figuur pas bij het wegschrijven, zodat een fout in één
+# figuur alleen die figuur kost. Een fout in de gedeelde opbouw van een
+# onderdeel (data inladen) stopt alleen dat onderdeel.
+
+def _mislukt(fout):
+    def maak():
+        raise fout
+    return maak
+
+
+def laadpaal_figuren(pad=LAADDATA, dagen=None):
+    data = ls.laadpaal_data(pad)
+    laaddata, agg, index, benutting = data["laaddata"], data["agg"], data["index"], data["analyse"]
+
+    yield "laadpaal/tijd_histogram", lambda: lg.tijd_histogram(agg, True)
+    yield "laadpaal/tijd_scatter", lambda: lg.tijd_scatter(laaddata, agg)
+    yield "laadpaal/energie_scatter", lambda: lg.energie_scatter(laaddata, agg, True)
+    for kolom, (kleuren, label) in lg.BOXEN.items():
+        yield f"laadpaal/box_{kolom}", lambda k=kolom, kl=kleuren, lab=label: lg.box_figuur(agg, k, kl, lab, True)
+
+    yield "laadpaal/bezetting_week", lambda: lg.week_figuur(lb.week_heatmap(index))
+    for grootheid in ["benutting", "ladend", "vermogen"]:
+        yield f"laadpaal/{grootheid}_week", lambda g=grootheid: lg.uur_van_week_figuur(
+            la.uur_van_week(benutting, index, g), f"Gemiddeld per weekdag en uur: {g}", g)
+    yield "laadpaal/piekvermogen_dag", lambda: lg.piek_figuur(la.piek_per_dag(benutting))
+    yield "laadpaal/piekvermogen_maand", lambda: lg.overzicht_figuur(
+        la.maand_overzicht(benutting, index), ["Piek kW", "Dagpiek p95 kW", "Dagpiek p50 kW"],
+        "Piekvermogen per maand", "kW")
+
+    def niet_ladend():
+        overzicht = la.maand_overzicht(benutting, index)
+        return lg.overzicht_figuur(overzicht, [k for k in overzicht.columns if k.startswith("Niet-ladend")],
+                                   "ConnectedTime − ChargeTime per maand", "Uur")
+    yield "laadpaal/niet_ladend_maand", niet_ladend
+    eerste_dag = pd.Timestamp(index["eerste_dag"])
+    laatste_dag = eerste_dag + pd.Timedelta(days=index["matrix"].shape[0] - 1)
+    for maand in pd.period_range(eerste_dag, laatste_dag, freq="M").astype(str):
+        yield f"laadpaal/bezetting_maand/{maand}", lambda m=maand: lg.maand_figuur(lb.maand_heatmap(index, m), m)
+
+    # Voorspelling per bron en grootheid, en de voorspelde dagen met band
+    try:
+        voorspelling = lv.laad_voorspelling(pad, laaddata, data["eerste"], data["laatste"])
+    except Exception as fout:  # de dagfiguren hieronder gaan gewoon door
+        yield "laadpaal/voorspelling", _mislukt(fout)
+    else:
+        for bron in voorspelling["kwaliteit"]["bron"].unique():
+            for grootheid in lv.GROOTHEDEN:
+                yield f"laadpaal/voorspelling/{bron}_{grootheid}", lambda b=bron, g=grootheid: lg.voorspelling_figuur(
+                    lv.segment(voorspelling["voorspelling"], b, g), f"Voorspelling per uur: {b}",
+                    "kWh" if g == "kwh" else "Aantal autos")
+        band = lv.segment(voorspelling["voorspelling"], lv.bron_naam(pad), "aangesloten")
+        for dag in band["Uur"].dt.normalize().unique():
+            yield f"laadpaal/voorspelling_dag/{dag.date()}", lambda d=dag: lg.dag_figuur(
+                lb.dag_uit_index(index, d), d.date(), band[band["Uur"].dt.normalize() == d])
+
+    # Standaard één dagfiguur per dag over het laatste jaar
+    begin, einde = dagen or (max(eerste_dag, laatste_dag - pd.Timedelta(days=364)), laatste_dag)
+    for dag in pd.date_range(begin, einde, freq="D").date:
+        yield f"laadpaal/bezetting_dag/{dag}", lambda d=dag: lg.dag_figuur(lb.dag_uit_index(index, d), d)
+
+
+def auto_figuren(pad=CARS):
+    import prijsModel as pm
+    import voertuigData as vd
+
+    cars = vd.laad_voertuigen(pad)
+    kubus = vd.bouw_kubus(cars)
+    totaal_per_merk = vd.merk_totalen(kubus)
+    top10 = totaal_per_merk.nlargest(10).index
+    per_maand = vd.per_merk_per_maand(kubus, top10)
+
+    yield "auto/top5", lambda: ag.top_merken_figuur(per_maand, totaal_per_merk.nlargest(5).index,
+                                                    "📈 Aantal auto's per merk (Top 5) door de maanden heen")
+    yield "auto/top10", lambda: ag.top_merken_figuur(per_maand, top10,
+                                                     "📈 Aantal auto's per merk (Top 10) door de maanden heen")
+    for merk in top10:
+        yield f"auto/modeltrends/{merk}", lambda m=merk: ag.merk_trends_figuur(vd.per_model_per_maand(kubus, m), m)
+    yield "auto/inrichting", lambda: ag.inrichting_figuur(vd.per_inrichting(kubus), True)
+
+    def lengte_breedte():
+        piramide = vd.bouw_piramide(cars)
+        cellen, bakken = vd.piramide_cellen(piramide, max_cellen=ag.MAX_POINTS)
+        return ag.lengte_breedte_figuur(cellen, piramide["sommen"], vd.piramide_bereik(piramide), bakken)
+    yield "auto/lengte_breedte", lengte_breedte
+    yield "auto/prijsmodel", lambda: ag.prijs_figuur(pm.laad_of_train(pad))
+
+
+def dichtheid_figuren(pad=CARS):
+    """Laadpalen per elektrische auto per regio, met de laadpalen uit de snapshot."""
+    import laadpaalDichtheid as ld
+    import openChargeMap as ocm
+    import voertuigData as vd
+
+    locaties, index = ocm.locaties(ocm.laadpalen(offline=True))
+    tijdlijn = ld.bouw_dichtheid(vd.laad_voertuigen(pad), locaties, index)["tijdlijn"]
+    for niveau in ld.NIVEAUS:
+        deel = tijdlijn[tijdlijn["niveau"] == niveau]
+        grootheid = "per_1000_ev" if deel["per_1000_ev"].notna().any() else "laadpalen"
+        yield f"dichtheid/{niveau}", lambda d=deel, g=grootheid: ag.dichtheid_trend_figuur(d, g)
+
+
+def kaart(map_):
+    """Laadpalenkaart als HTML uit de snapshot (geen netwerk)."""
+    import laadpaalKaarten as kk
+    import openChargeMap as ocm
+
+    laadpalen = ocm.laadpalen(offline=True)
+    locaties, _ = ocm.locaties(laadpalen)
+    m = kk.laadpalen_kaart("Alle provincies", locaties)
+    bestand = os.path.join(map_, "kaart", "laadpalen.html")
+    os.makedirs(os.path.dirname(bestand), exist_ok=True)
+    m.save(bestand)
+    return {"naam": "kaart/laadpalen", "bestanden": [bestand], "laadpalen": len(locaties)}
+
+
+# --- Wegschrijven in de procespool ---
+
+def _schrijf(naam, fig_json, formaten, map_):
+    import plotly.io as pio
+
+    begin = time.perf_counter()
+    regel = {"naam": naam, "bestanden": []}
+    try:
+        fig = pio.from_json(fig_json)
+        basis = os.path.join(map_, *naam.split("/"))
+        os.makedirs(os.path.dirname(basis), exist_ok=True)
+        for formaat in formaten:
+            bestand = f"{basis}.{formaat}"
+            if formaat == "html":
+                fig.write_html(bestand, include_plotlyjs="cdn")
+            elif formaat == "json":
+                with open(bestand, "w", encoding="utf-8") as f:
+                    f.write(fig_json)
+            else:
+                fig.write_image(bestand)  # kaleido
+            regel["bestanden"].append(bestand)
+    except Exception as fout:  # één mislukte figuur stopt de rest niet
+        regel["fout"] = f"{type(fout).__name__}: {fout}"
+    regel["duur_s"] = round(time.perf_counter() - begin, 3)
+    return regel
+
+
+def _fout_regel(naam, fout):
+    return {"naam": naam, "bestanden": [], "fout": f"{type(fout).__name__}: {fout}"}
+
+
+def _bouw(naam_onderdeel, onderdeel):
+    """(naam, figuur, None) per figuur, of (naam, None, fout) als het bouwen mislukt."""
+    try:
+        for naam, maak in onderdeel:
+            try:
+                yield naam, maak(), None
+            except Exception as fout:  # één mislukte figuur stopt de rest niet
+                yield naam, None, fout
+    except Exception as fout:  # opbouw van het onderdeel zelf mislukt
+        yield naam_onderdeel, None, fout
+
+
+def maak_rapport(map_="rapport", formaten=("html",), dagen=None, processen=None, zonder=()):
+    os.makedirs(map_, exist_ok=True)
+    bronnen = {}
+    onderdelen = []
+    if "laadpaal" not in zonder and os.path.exists(LAADDATA):
+        bronnen[LAADDATA] = li.cache_sleutel(LAADDATA)
+        onderdelen.append(("laadpaal", laadpaal_figuren(LAADDATA, dagen)))
+    if "auto" not in zonder and os.path.exists(CARS):
+        bronnen[CARS] = li.cache_sleutel(CARS)
+        onderdelen.append(("auto", auto_figuren(CARS)))
+    if "dichtheid" not in zonder and os.path.exists(CARS):
+        import openChargeMap as ocm
+
+        if os.path.exists(ocm.SNAPSHOT):
+            onderdelen.append(("dichtheid", dichtheid_figuren(CARS)))
+
+    # Figuren worden in dit proces gebouwd (snel, uit de caches); het
+    # wegschrijven is het dure deel en gaat naar de pool. Bouwfouten komen
+    # als regel in het manifest, net als fouten bij het wegschrijven.
+    begin = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processen) as pool:
+        taken = []
+        for naam_onderdeel, onderdeel in onderdelen:
+            for naam, fig, fout in _bouw(naam_onderdeel, onderdeel):
+                taken.append(_fout_regel(naam, fout) if fout is not None else
+                             pool.submit(_schrijf, naam, fig.to_json(), list(formaten), map_))
+        regels = [taak if isinstance(taak, dict) else taak.result() for taak in taken]
+
+    if "kaart" not in zonder:
+        try:
+            regels.append(kaart(map_))
+        except (OSError, ValueError) as fout:
+            regels.append(_fout_regel("kaart/laadpalen", fout))
+
+    manifest = {
+        "gemaakt": datetime.datetime.now().isoformat(timespec="seconds"),
+        "bronnen": bronnen,
+        "formaten": list(formaten),
+        "duur_s": round(time.perf_counter() - begin, 2),
+        "figuren": regels,
+    }
+    with open(os.path.join(map_, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    return manifest
+
+
+def _argument(naam, standaard):
+    return sys.argv[sys.argv.index(naam) + 1] if naam in sys.argv else standaard
+
+
+if __name__ == "__main__":
+    formaten = _argument("--formaat", "html").split(",")
+    dagen = _argument("--dagen", None)
+    dagen = tuple(pd.Timestamp(d) for d in dagen.split(":")) if dagen else None
+    processen = _argument("--processen", None)
+
+    manifest = maak_rapport(
+        _argument("--uit", "rapport"),
+        formaten,
+        dagen,
+        int(processen) if processen else None,
+        _argument("--zonder", "").split(","),
+    )
+    fouten = [r for r in manifest["figuren"] if "fout" in r]
+    print(f"{len(manifest['figuren'])} figuren in {manifest['duur_s']} s, {len(fouten)} fouten")
+    for regel in fouten[:10]:
+        print(f"  {regel['naam']}: {regel['fout']}")
+    sys.exit(1 if fouten else 0)
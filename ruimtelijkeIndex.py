@@ -0,0 +1,160 @@
+import os
+import re
+
+import numpy as np
+
+# --- Ruimtelijke index voor laadpalen ---
+# Een simpel grid (vaste cellen in graden) met de punten gesorteerd op cel.
+# Een straal-query leest alleen de cellen binnen de bounding box van de
+# cirkel; de exacte afstand wordt daarna met haversine berekend.
+
+CEL_GRADEN = 0.05
+AARDSTRAAL_KM = 6371.0
+
+# 📍 Coördinaten van provincies
+PROVINCIE_LOCATIES = {
+    "Alle provincies": {"center": [52.2129919, 5.2793703], "zoom": 7},   # Midden Nederland
+    "Groningen": {"center": [53.2194, 6.5665], "zoom": 10},
+    "Friesland": {"center": [53.1642, 5.7818], "zoom": 10},
+    "Drenthe": {"center": [52.9480, 6.6231], "zoom": 10},
+    "Overijssel": {"center": [52.4380, 6.5010], "zoom": 10},
+    "Flevoland": {"center": [52.5279, 5.5953], "zoom": 10},
+    "Gelderland": {"center": [52.0452, 5.8718], "zoom": 10},
+    "Utrecht": {"center": [52.0907, 5.1214], "zoom": 11},
+    "Noord-Holland": {"center": [52.5200, 4.7885], "zoom": 9},
+    "Zuid-Holland": {"center": [51.9961, 4.5597], "zoom": 10},
+    "Zeeland": {"center": [51.4940, 3.8490], "zoom": 10},
+    "Noord-Brabant": {"center": [51.4827, 5.2322], "zoom":10},
+    "Limburg": {"center": [51.4427, 6.0600], "zoom": 9}
+}
+PROVINCIES = [p for p in PROVINCIE_LOCATIES if p != "Alle provincies"]
+
+# Provinciegrenzen (bijv. de CBS-provinciegrenzen als GeoJSON); als dit
+# bestand er niet is wordt het adresveld uit OpenChargeMap gebruikt
+PROVINCIE_GRENZEN = os.environ.get("PROVINCIE_GRENZEN", "provincies.geojson")
+
+# Schrijfwijzen van StateOrProvince in OpenChargeMap
+_ALIASSEN = {
+    "northholland": "Noord-Holland", "nh": "Noord-Holland",
+    "southholland": "Zuid-Holland", "zh": "Zuid-Holland",
+    "northbrabant": "Noord-Brabant", "brabant": "Noord-Brabant", "nb": "Noord-Brabant",
+    "fryslan": "Friesland", "frysln": "Friesland", "frisia": "Friesland",
+    "ut": "Utrecht", "gld": "Gelderland", "ov": "Overijssel",
+    "dr": "Drenthe", "gr": "Groningen", "fl": "Flevoland", "li": "Limburg", "ze": "Zeeland",
+}
+_ALIASSEN.update({re.sub(r"[^a-z]", "", p.lower()): p for p in PROVINCIES})
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * AARDSTRAAL_KM * np.arcsin(np.sqrt(a))
+
+
+def bouw_index(lat, lon, cel=CEL_GRADEN):
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    if len(lat) == 0:
+        lat0 = lon0 = 0.0
+    else:
+        lat0, lon0 = lat.min(), lon.min()
+
+    rij = np.floor((lat - lat0) / cel).astype(np.int64)
+    kol = np.floor((lon - lon0) / cel).astype(np.int64)
+    n_kol = int(kol.max()) + 1 if len(kol) else 1
+    cel_id = rij * n_kol + kol
+
+    volgorde = np.argsort(cel_id, kind="stable")
+    return {
+        "lat": lat,
+        "lon": lon,
+        "lat0": lat0,
+        "lon0": lon0,
+        "cel": cel,
+        "n_rij": int(rij.max()) + 1 if len(rij) else 1,
+        "n_kol": n_kol,
+        "volgorde": volgorde,
+        "cel_id": cel_id[volgorde],
+    }
+
+
+def binnen_straal(index, lat, lon, km):
+    """(posities, afstanden) van alle punten binnen km van (lat, lon), oplopend."""
+    dlat = km / 111.2
+    dlon = km / (111.2 * max(np.cos(np.radians(lat)), 1e-6))
+    cel = index["cel"]
+
+    r0 = max(int(np.floor((lat - dlat - index["lat0"]) / cel)), 0)
+    r1 = min(int(np.floor((lat + dlat - index["lat0"]) / cel)), index["n_rij"] - 1)
+    k0 = max(int(np.floor((lon - dlon - index["lon0"]) / cel)), 0)
+    k1 = min(int(np.floor((lon + dlon - index["lon0"]) / cel)), index["n_kol"] - 1)
+    if r0 > r1 or k0 > k1:
+        return np.array([], dtype=np.int64), np.array([])
+
+    # Per rij van het grid is het stuk k0..k1 aaneengesloten in de sortering
+    rijen = np.arange(r0, r1 + 1)
+    begin = np.searchsorted(index["cel_id"], rijen * index["n_kol"] + k0, side="left")
+    einde = np.searchsorted(index["cel_id"], rijen * index["n_kol"] + k1, side="right")
+    kandidaten = index["volgorde"][np.concatenate([np.arange(b, e) for b, e in zip(begin, einde)])]
+
+    afstand = haversine_km(lat, lon, index["lat"][kandidaten], index["lon"][kandidaten])
+    binnen = afstand <= km
+    kandidaten, afstand = kandidaten[binnen], afstand[binnen]
+    volgorde = np.argsort(afstand, kind="stable")
+    return kandidaten[volgorde], afstand[volgorde]
+
+
+def dichtstbij(index, lat, lon, n):
+    """(posities, afstanden) van de n dichtstbijzijnde punten."""
+    n = min(n, len(index["lat"]))
+    if n == 0:
+        return np.array([], dtype=np.int64), np.array([])
+
+    # Straal verdubbelen tot er genoeg punten binnen vallen; alles binnen de
+    # straal is exact gevonden, dus de eerste n zijn ook echt de dichtstbijzijnde
+    km = index["cel"] * 111.2
+    while True:
+        posities, afstanden = binnen_straal(index, lat, lon, km)
+        if len(posities) >= n:
+            return posities[:n], afstanden[:n]
+        km *= 2
+
+
+def normaliseer_provincie(naam):
+    if not isinstance(naam, str):
+        return None
+    return _ALIASSEN.get(re.sub(r"[^a-z]", "", naam.lower()))
+
+
+def provincie_per_punt(lat, lon, adres_provincie=None, grenzen=PROVINCIE_GRENZEN):
+    """Provincie voor elk punt, één keer per dataversie uit te rekenen.
+
+    Met een grenzenbestand: point-in-polygon via geopandas (STRtree). Anders
+    het StateOrProvince-veld van OpenChargeMap, en voor wat dan nog onbekend
+    is de provincie met het dichtstbijzijnde middelpunt.
+    """
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    provincie = np.full(len(lat), None, dtype=object)
+
+    if grenzen and os.path.exists(grenzen):
+        import geopandas as gpd
+
+        vlakken = gpd.read_file(grenzen).to_crs("EPSG:4326")
+        naam_kolom = next(k for k in ["statnaam", "naam", "name", "provincie"] if k in vlakken.columns)
+        punten = gpd.GeoDataFrame(geometry=gpd.points_from_xy(lon, lat), crs="EPSG:4326")
+        gekoppeld = gpd.sjoin(punten, vlakken[[naam_kolom, "geometry"]], how="left", predicate="within")
+        gekoppeld = gekoppeld[~gekoppeld.index.duplicated()]
+        provincie[:] = [normaliseer_provincie(p) for p in gekoppeld[naam_kolom]]
+
+    if adres_provincie is not None:
+        onbekend = np.array([p is None for p in provincie])
+        provincie[onbekend] = [normaliseer_provincie(p) for p in np.asarray(adres_provincie, dtype=object)[onbekend]]
+
+    onbekend = np.array([p is None for p in provincie], dtype=bool)
+    if onbekend.any():
+        centra = np.array([PROVINCIE_LOCATIES[p]["center"] for p in PROVINCIES])
+        afstand = haversine_km(lat[onbekend, None], lon[onbekend, None], centra[None, :, 0], centra[None, :, 1])
+        provincie[onbekend] = np.asarray(PROVINCIES, dtype=object)[afstand.argmin(axis=1)]
+
+    return provincie
@@ -0,0 +1,32 @@
+import numpy as np
+
+# --- OLS trendlijn uit voldoende statistieken ---
+# Per groep alleen n, Σx, Σy, Σxy, Σx², Σy² bijhouden. Nieuwe rijen erbij is
+# optellen, en de fit zelf is een paar rekenkundige bewerkingen; geen
+# statsmodels nodig.
+
+N, SX, SY, SXY, SXX, SYY = range(6)
+
+
+def sommen(x, y):
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    goed = np.isfinite(x) & np.isfinite(y)
+    x, y = x[goed], y[goed]
+    return np.array([len(x), x.sum(), y.sum(), (x * y).sum(), (x * x).sum(), (y * y).sum()])
+
+
+def fit(stats):
+    """(helling, snijpunt, R²) van y = helling * x + snijpunt, of None."""
+    n = stats[N]
+    sxx = n * stats[SXX] - stats[SX] ** 2
+    syy = n * stats[SYY] - stats[SY] ** 2
+    sxy = n * stats[SXY] - stats[SX] * stats[SY]
+    if n < 2 or sxx <= 0:
+        return None
+
+    helling = sxy / sxx
+    snijpunt = (stats[SY] - helling * stats[SX]) / n
+    r2 = sxy ** 2 / (sxx * syy) if syy > 0 else 1.0
+    return helling, snijpunt, r2
+
@@ -0,0 +1,244 @@
+import logging
+import os
+import threading
+import time
+
+import laadpaalInlezen as li
+import profiel
+
+# --- Verversen van de data buiten het request-pad ---
+# Per onderdeel (sessies, laadpalen, voertuigen, prijsmodel, laadpalen per
+# auto, voorspelling) draait een daemon-thread die periodiek een goedkope
+# versie van de bron opvraagt (grootte + mtime, een tijdvak voor
+# OpenChargeMap, of de versies van andere onderdelen). Is die veranderd,
+# dan wordt alles wat de pagina's nodig hebben opnieuw opgebouwd en als
+# nieuwe momentopname gepubliceerd: een nieuw dict dat in één toewijzing de
+# vorige vervangt. Pagina's lezen alleen de huidige momentopname en wachten
+# nooit op I/O, behalve één keer op de allereerste opbouw.
+#
+# Een thread start pas bij de eerste huidig(naam), samen met de onderdelen
+# waar hij van afhangt. Een pagina laadt dus alleen de data (en
+# bibliotheken) van de onderdelen die ze zelf opvraagt.
+#
+# Een momentopname wordt na publicatie niet meer aangepast; een render die
+# er één heeft opgehaald ziet dus tot het eind dezelfde versie van de data.
+#
+# Elke opbouw wordt geprofileerd: de stappen met profiel.gemeten (inlezen,
+# index, kubus, ophalen) staan in de momentopname en in status().
+
+INTERVAL = float(os.environ.get("VERVERS_INTERVAL", 60))  # seconden
+LAADPALEN_INTERVAL = float(os.environ.get("LAADPALEN_INTERVAL", 3600))
+
+LAADDATA = "laadpaaldata.csv"
+CARS = "cars.pkl"
+
+log = logging.getLogger(__name__)
+
+
+# --- Onderdelen: (versie van de bron, opbouw) ---
+# De opbouw krijgt de huidige momentopname mee, zodat het prijsmodel de al
+# ingeladen voertuigen kan hergebruiken.
+
+def _laadpaal(momentopname):
+    import laadpaalStream as ls
+
+    return ls.laadpaal_data(LAADDATA)
+
+
+def _laadpalen_versie():
+    # Geen goedkope versie bij een API: gewoon eens per interval opnieuw
+    return int(time.time() // LAADPALEN_INTERVAL)
+
+
+def _laadpalen(momentopname):
+    import openChargeMap as ocm
+
+    laadpalen = ocm.laadpalen()
+    locaties, index = ocm.locaties(laadpalen)
+    return {"laadpalen": laadpalen, "locaties": locaties, "index": index, "hash": ocm.versie(laadpalen)}
+
+
+def _voertuigen(momentopname):
+    import voertuigData as vd
+
+    cars = vd.laad_voertuigen(CARS)
+    return {"cars": cars, "kubus": vd.bouw_kubus(cars), "piramide": vd.bouw_piramide(cars)}
+
+
+def _prijsmodel_versie():
+    import prijsModel as pm
+
+    sleutel = li.cache_sleutel(CARS)
+    # Een nieuw leaderboard kan een ander model als winnaar aanwijzen
+    return sleutel, os.path.exists(pm.leaderboard_pad(CARS, sleutel))
+
+
+def _prijsmodel(momentopname):
+    import prijsModel as pm
+
+    voertuigen = momentopname.get("voertuigen")
+    if voertuigen is None or voertuigen["versie"] != li.cache_sleutel(CARS):
+        artefacten = pm.laad_of_train(CARS)
+    else:
+        artefacten = pm.laad_of_train(CARS, voertuigen["data"]["cars"])
+    # Het leaderboard hoort bij dezelfde versie; de pagina leest niets van schijf
+    return {**artefacten, "leaderboard": pm.laad_leaderboard(CARS)}
+
+
+def _bron(momentopname, naam):
+    # Data van een onderdeel waar een ander van afhangt; is dat mislukt, dan
+    # de oorspronkelijke fout in plaats van een TypeError op None
+    deel = momentopname[naam]
+    if deel["data"] is None:
+        raise deel["fout"]
+    return deel
+
+
+def _dichtheid_versie():
+    # Opnieuw zodra een van beide bronnen een nieuwe momentopname heeft
+    return _bron(_momentopname, "voertuigen")["versie"], _bron(_momentopname, "laadpalen")["data"]["hash"]
+
+
+def _dichtheid(momentopname):
+    import laadpaalDichtheid as ld
+
+    laadpalen = _bron(momentopname, "laadpalen")["data"]
+    cars = _bron(momentopname, "voertuigen")["data"]["cars"]
+    return ld.bouw_dichtheid(cars, laadpalen["locaties"], laadpalen["index"])
+
+
+def _voorspelling_versie():
+    import laadpaalVoorspelling as lv
+
+    # Nieuwe sessies in een van beide bronnen: opnieuw trainen
+    return _bron(_momentopname, "laadpaal")["versie"], lv.bron_sleutel(LAADDATA)
+
+
+def _voorspelling(momentopname):
+    import laadpaalVoorspelling as lv
+
+    data = _bron(momentopname, "laadpaal")["data"]
+    return lv.laad_voorspelling(LAADDATA, data["laaddata"], data["eerste"], data["laatste"])
+
+
+ONDERDELEN = {
+    "laadpaal": (lambda: li.cache_sleutel(LAADDATA), _laadpaal, INTERVAL),
+    "laadpalen": (_laadpalen_versie, _laadpalen, INTERVAL),
+    "voertuigen": (lambda: li.cache_sleutel(CARS), _voertuigen, INTERVAL),
+    "prijsmodel": (_prijsmodel_versie, _prijsmodel, INTERVAL),
+    "dichtheid": (_dichtheid_versie, _dichtheid, INTERVAL),
+    "voorspelling": (_voorspelling_versie, _voorspelling, INTERVAL),
+}
+# Eerst wachten op deze onderdelen voordat de eerste opbouw begint
+AFHANKELIJK = {"prijsmodel": ["voertuigen"], "dichtheid": ["voertuigen", "laadpalen"],
+               "voorspelling": ["laadpaal"]}
+
+
+# --- Gedeelde toestand ---
+_momentopname = {}
+_klaar = {naam: threading.Event() for naam in ONDERDELEN}
+_schrijven = threading.Lock()
+_gestart = set()
+
+
+def _publiceer(naam, deel):
+    global _momentopname
+    with _schrijven:
+        # Nieuw dict in plaats van bijwerken: lezers houden hun eigen versie
+        _momentopname = {**_momentopname, naam: deel}
+    _klaar[naam].set()
+
+
+def ververs(naam):
+    """Bouw één onderdeel opnieuw op als de bron veranderd is.
+
+    Geeft True terug als er een nieuwe versie gepubliceerd is. Een fout
+    wordt gelogd; de vorige versie blijft dan staan.
+    """
+    versie_van, bouw, _ = ONDERDELEN[naam]
+    vorige = _momentopname.get(naam)
+    try:
+        versie = versie_van()
+        if vorige is not None and vorige["versie"] == versie and "fout" not in vorige:
+            return False
+
+        profiel.begin_render(True, f"verversing {naam}")
+        begin = time.perf_counter()
+        data = bouw(_momentopname)
+        _publiceer(naam, {
+            "versie": versie,
+            "data": data,
+            "gebouwd": time.time(),
+            "duur_s": round(time.perf_counter() - begin, 3),
+            "metingen": profiel.metingen(),
+        })
+        return True
+    except Exception as fout:  # de thread mag niet stoppen
+        log.exception("Verversen van %s mislukt", naam)
+        if vorige is None or "fout" in vorige:
+            # Nog niets om te tonen: de fout publiceren zodat wachtende pagina's hem zien
+            _publiceer(naam, {"versie": None, "data": None, "gebouwd": time.time(), "fout": fout})
+        return False
+
+
+def _lus(naam):
+    for nodig in AFHANKELIJK.get(naam, []):
+        _klaar[nodig].wait()
+    interval = ONDERDELEN[naam][2]
+    while True:
+        ververs(naam)
+        time.sleep(interval)
+
+
+def start(naam):
+    """Start de verversthread van naam en van de onderdelen waar die van afhangt.
+
+    Vaker aanroepen (elke rerun) doet niets.
+    """
+    for nodig in AFHANKELIJK.get(naam, []):
+        start(nodig)
+    with _schrijven:
+        if naam in _gestart:
+            return
+        _gestart.add(naam)
+    threading.Thread(target=_lus, args=(naam,), name=f"verversing-{naam}", daemon=True).start()
+
+
+def gestart():
+    """De onderdelen waarvan de thread loopt."""
+    return set(_gestart)
+
+
+def huidig(naam, timeout=None):
+    """De huidige versie van een onderdeel: {"versie", "data", "gebouwd", ...}.
+
+    Blokkeert alleen totdat het onderdeel voor het eerst is opgebouwd. Is
+    die eerste opbouw mislukt, dan wordt de fout hier opnieuw opgegooid.
+    """
+    start(naam)
+    if not _klaar[naam].wait(timeout):
+        raise TimeoutError(f"{naam} is nog niet geladen")
+    return _bron(_momentopname, naam)
+
+
+def _stappen(metingen):
+    # Totale duur per gemeten stap; aggregeer loopt bij streamen per blok
+    totaal = {}
+    for meting in metingen:
+        totaal[meting["stap"]] = round(totaal.get(meting["stap"], 0) + meting["duur_ms"], 2)
+    return totaal
+
+
+def status():
+    """Versie, leeftijd, opbouwduur en gemeten stappen per onderdeel, voor het debugpaneel."""
+    nu = time.time()
+    return {
+        naam: {
+            "versie": str(deel["versie"]),
+            "leeftijd_s": round(nu - deel["gebouwd"], 1),
+            "duur_s": deel.get("duur_s"),
+            "stappen_ms": _stappen(deel.get("metingen", [])),
+            **({"fout": repr(deel["fout"])} if "fout" in deel else {}),
+        }
+        for naam, deel in _momentopname.items()
+    }
@@ -0,0 +1,257 @@
+import os
+import glob
+
+import numpy as np
+import pandas as pd
+
+import laadpaalInlezen as li
+import profiel
+import trendlijn as tl
+
+# --- Voertuigdata (RDW) ---
+# cars.pkl wordt één keer per versie ingeladen, getypeerd en genormaliseerd,
+# als cache naast cars.pkl bewaard, en daarna door verversing als één
+# gedeeld frame uitgedeeld aan car_data() en carsy().
+# Dat frame niet aanpassen: kolommen erbij via .assign() of op een kopie.
+
+NUMERIEKE_KOLOMMEN = [
+    'catalogusprijs',
+    'massa_ledig_voertuig',
+    'vermogen_massarijklaar',
+    'lengte',
+    'breedte',
+    'hoogte_voertuig',
+]
+CATEGORIE_KOLOMMEN = ['merk', 'inrichting', 'jaar_maand', 'model_basis']
+KUBUS_DIMENSIES = ['jaar_maand', 'merk', 'model_basis', 'inrichting']
+
+
+# --- Normalisatie van handelsbenaming naar model_basis ---
+# Zelfde regels als de oude normalize_model(), maar met str.extract over de
+# unieke namen (de categorieën) in plaats van re.match per rij.
+def normaliseer_namen(namen):
+    namen = pd.Series(namen, dtype=object).str.upper().str.strip()
+    model = namen.str.extract(r'^(MODEL [A-Z0-9]+)', expand=False)
+    id_ = namen.str.extract(r'^(ID\.?\s*\d)', expand=False).str.replace(' ', '')
+    e_ = namen.str.extract(r'^(E[-\s]?\d+)', expand=False).str.replace(' ', '')
+    return model.fillna(id_).fillna(e_).fillna(namen.str.split().str[0])
+
+
+def normaliseer_modellen(handelsbenaming):
+    """model_basis per rij, berekend over alleen de unieke handelsbenamingen."""
+    namen = handelsbenaming.astype('category')
+    basis = normaliseer_namen(namen.cat.categories).to_numpy(dtype=object)
+
+    codes = namen.cat.codes.to_numpy()
+    uitkomst = np.full(len(codes), None, dtype=object)
+    gevuld = codes >= 0
+    uitkomst[gevuld] = basis[codes[gevuld]]
+    return pd.Series(uitkomst, index=handelsbenaming.index, dtype='category')
+
+
+def laad_voertuigen(pad='cars.pkl'):
+    """Getypeerde voertuigen uit de cache, of opnieuw uit cars.pkl.
+
+    De cache hoort bij één versie van cars.pkl (grootte + mtime), dus
+    model_basis wordt maar één keer per dataversie berekend.
+    """
+    # Pickle in plaats van Parquet: de RDW-kolommen die niet omgezet worden
+    # kunnen gemengde types bevatten
+    cache = li.cache_pad(pad, li.cache_sleutel(pad), extensie=".pkl")
+    if os.path.exists(cache):
+        return pd.read_pickle(cache)
+
+    cars = bereid_voertuigen(pd.read_pickle(pad))
+
+    for oud in glob.glob(li.cache_pad(pad, "*", extensie=".pkl")):
+        os.remove(oud)
+    tijdelijk = cache + ".tmp"
+    cars.to_pickle(tijdelijk)
+    os.replace(tijdelijk, cache)
+
+    return cars
+
+
+def bereid_voertuigen(cars):
+    cars['datum_eerste_toelating'] = pd.to_datetime(cars['datum_eerste_toelating'], errors='coerce')
+    cars['jaar_maand'] = cars['datum_eerste_toelating'].dt.to_period('M').astype(str)
+
+    # Alles wat als tekst binnenkomt maar een getal is één keer omzetten
+    for kolom in NUMERIEKE_KOLOMMEN:
+        cars[kolom] = pd.to_numeric(cars[kolom], errors='coerce').astype('float32')
+
+    cars['model_basis'] = normaliseer_modellen(cars['handelsbenaming'])
+
+    for kolom in CATEGORIE_KOLOMMEN:
+        cars[kolom] = cars[kolom].astype('category')
+
+    return cars
+
+
+def versie(pad='cars.pkl'):
+    """Versie van cars.pkl (grootte + mtime), als sleutel voor afgeleide caches."""
+    return li.cache_sleutel(pad)
+
+
+# --- Tellingen-kubus: maand x merk x model_basis x inrichting ---
+# Alleen gevulde cellen, gesorteerd op merk zodat elk merk een aaneengesloten
+# blok rijen is. Top-N, modeltrends en de carrosserie-histogram zijn daarmee
+# sommen over een paar duizend cellen in plaats van over alle voertuigen.
+# Cellen zonder merk (code -1) staan vooraan, zodat de codes oplopen en
+# searchsorted de grenzen per merk geeft; ze tellen wel mee in de totalen.
+
+@profiel.gemeten("vd.bouw_kubus")
+def bouw_kubus(cars):
+    cellen = (
+        cars.groupby(KUBUS_DIMENSIES, observed=True, dropna=False)
+            .size()
+            .astype('int32')
+            .reset_index(name='aantal')
+            .sort_values('merk', kind='stable', na_position='first')
+            .reset_index(drop=True)
+    )
+
+    merken = cellen['merk'].cat.categories
+    grenzen = np.searchsorted(cellen['merk'].cat.codes.to_numpy(), np.arange(len(merken) + 1))
+    return {
+        "cellen": cellen,
+        "merk_grenzen": grenzen,
+        "merk_code": {str(m).upper(): i for i, m in enumerate(merken)},
+    }
+
+
+def merk_totalen(kubus):
+    return kubus["cellen"].groupby('merk', observed=True)['aantal'].sum().sort_values(ascending=False)
+
+
+def per_merk_per_maand(kubus, merken=None):
+    cellen = kubus["cellen"]
+    if merken is not None:
+        cellen = cellen[cellen['merk'].isin(merken)]
+    return (
+        cellen.groupby(['jaar_maand', 'merk'], observed=True)['aantal']
+            .sum()
+            .reset_index(name='aantal_autos')
+    )
+
+
+def merk_cellen(kubus, merknaam):
+    """De cellen van één merk (hoofdletterongevoelig) als slice, zonder scan."""
+    code = kubus["merk_code"].get(str(merknaam).upper())
+    if code is None:
+        return kubus["cellen"].iloc[0:0]
+    return kubus["cellen"].iloc[kubus["merk_grenzen"][code]:kubus["merk_grenzen"][code + 1]]
+
+
+def per_model_per_maand(kubus, merknaam):
+    return (
+        merk_cellen(kubus, merknaam)
+            .groupby(['jaar_maand', 'model_basis'], observed=True)['aantal']
+            .sum()
+            .reset_index(name='aantal_autos')
+    )
+
+
+def per_inrichting(kubus):
+    return kubus["cellen"].groupby('inrichting', observed=True)['aantal'].sum().sort_values(ascending=False)
+
+
+# --- Piramide voor lengte x breedte ---
+# 2D-tellingen op een fijn raster (PIRAMIDE_BAKKEN per as) en daaruit steeds
+# grovere niveaus door 2x2 cellen samen te nemen. Per cel ook Σx en Σy, zodat
+# elk punt op het zwaartepunt van zijn auto's staat. Elke auto telt dus mee,
+# op elk niveau, en een niveau opvragen kost hoogstens PIRAMIDE_BAKKEN²
+# cellen, ongeacht het aantal voertuigen. De trendlijn komt uit de
+# voldoende statistieken over alle auto's.
+PIRAMIDE_BAKKEN = 1024
+PIRAMIDE_NIVEAUS = 6  # 1024, 512, ..., 32
+
+
+def _laag(aantal, som_x, som_y):
+    # Alleen gevulde cellen; flatnonzero geeft ze gesorteerd op (ix, iy)
+    b = aantal.shape[0]
+    plat = np.flatnonzero(aantal)
+    n = aantal.ravel()[plat]
+    return {
+        "bakken": b,
+        "ix": (plat // b).astype('int32'),
+        "iy": (plat % b).astype('int32'),
+        "aantal": n,
+        "x": som_x.ravel()[plat] / n,
+        "y": som_y.ravel()[plat] / n,
+    }
+
+
+def bouw_piramide(cars, bakken=PIRAMIDE_BAKKEN, niveaus=PIRAMIDE_NIVEAUS):
+    x = cars['breedte'].to_numpy(dtype='float64')
+    y = cars['lengte'].to_numpy(dtype='float64')
+    geldig = (x > 0) & (y > 0)  # NaN valt hier ook af
+    x, y = x[geldig], y[geldig]
+
+    if len(x):
+        # Maximum + 1 zodat de grootste waarde nog in de laatste bak valt
+        oorsprong = np.floor([x.min(), y.min()])
+        einde = np.floor([x.max(), y.max()]) + 1
+    else:
+        oorsprong, einde = np.zeros(2), np.ones(2)
+    cel = (einde - oorsprong) / bakken
+
+    ix = np.minimum(((x - oorsprong[0]) / cel[0]).astype(np.int64), bakken - 1)
+    iy = np.minimum(((y - oorsprong[1]) / cel[1]).astype(np.int64), bakken - 1)
+    plat = ix * bakken + iy
+    aantal = np.bincount(plat, minlength=bakken * bakken).reshape(bakken, bakken)
+    som_x = np.bincount(plat, weights=x, minlength=bakken * bakken).reshape(bakken, bakken)
+    som_y = np.bincount(plat, weights=y, minlength=bakken * bakken).reshape(bakken, bakken)
+
+    lagen = []
+    for _ in range(niveaus):
+        lagen.append(_laag(aantal, som_x, som_y))
+        b = aantal.shape[0]
+        if b % 2:
+            break
+        aantal, som_x, som_y = (m.reshape(b // 2, 2, b // 2, 2).sum(axis=(1, 3)) for m in (aantal, som_x, som_y))
+
+    return {
+        "oorsprong": oorsprong,
+        "einde": einde,
+        "lagen": lagen,  # van fijn naar grof
+        "sommen": tl.sommen(x, y),
+    }
+
+
+def piramide_bereik(piramide):
+    """((breedte_min, breedte_max), (lengte_min, lengte_max)) in hele cm."""
+    return tuple((int(o), int(e)) for o, e in zip(piramide["oorsprong"], piramide["einde"]))
+
+
+def piramide_cellen(piramide, x_bereik=None, y_bereik=None, max_cellen=5000):
+    """Cellen binnen het bereik op het fijnste niveau met hoogstens max_cellen.
+
+    Geeft een frame (breedte, lengte, aantal) met het zwaartepunt per cel en
+    het aantal bakken per as van het gekozen niveau. Het grofste niveau wordt
+    altijd teruggegeven, ook als het boven max_cellen uitkomt.
+    """
+    oorsprong, einde = piramide["oorsprong"], piramide["einde"]
+    x_bereik = (oorsprong[0], einde[0]) if x_bereik is None else x_bereik
+    y_bereik = (oorsprong[1], einde[1]) if y_bereik is None else y_bereik
+
+    for laag in piramide["lagen"]:
+        cel = (einde - oorsprong) / laag["bakken"]
+        i0, i1 = np.floor((np.asarray(x_bereik, dtype='float64') - oorsprong[0]) / cel[0])
+        j0, j1 = np.floor((np.asarray(y_bereik, dtype='float64') - oorsprong[1]) / cel[1])
+
+        # ix is gesorteerd: de kolommen in het bereik zijn één slice
+        begin = np.searchsorted(laag["ix"], i0, side='left')
+        eind = np.searchsorted(laag["ix"], i1, side='right')
+        iy = laag["iy"][begin:eind]
+        sel = begin + np.flatnonzero((iy >= j0) & (iy <= j1))
+        if len(sel) <= max_cellen or laag is piramide["lagen"][-1]:
+            break
+
+    cellen = pd.DataFrame({
+        'breedte': laag["x"][sel],
+        'lengte': laag["y"][sel],
+        'aantal': laag["aantal"][sel],
+    })
+    return cellen, laag["bakken"]
+